@@ -0,0 +1,58 @@
+import math
+from collections import deque
+from typing import Optional
+
+
+class LapStatistics:
+    """Running statistics over lap times in integer nanoseconds.
+
+    Every figure the statistics panel shows is kept up to date as laps are
+    added, so ``add()`` costs O(1) however long the session is: count,
+    sum, min and max directly, the variance with Welford's online
+    algorithm, and the current pace as the sum of a fixed window of the
+    most recent laps.
+    """
+
+    def __init__(self, pace_window: int = 3):
+        self.pace_window = pace_window
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns: Optional[int] = None
+        self.max_ns: Optional[int] = None
+        self._mean = 0.0
+        self._m2 = 0.0  # sum of squared differences from the mean
+        self._recent: deque = deque(maxlen=self.pace_window)
+        self._recent_ns = 0
+
+    def add(self, lap_ns: int):
+        self.count += 1
+        self.total_ns += lap_ns
+        if self.min_ns is None or lap_ns < self.min_ns:
+            self.min_ns = lap_ns
+        if self.max_ns is None or lap_ns > self.max_ns:
+            self.max_ns = lap_ns
+
+        delta = lap_ns - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (lap_ns - self._mean)
+
+        if len(self._recent) == self.pace_window:
+            self._recent_ns -= self._recent[0]
+        self._recent.append(lap_ns)
+        self._recent_ns += lap_ns
+
+    def mean_ns(self) -> int:
+        return self.total_ns // self.count if self.count else 0
+
+    def std_ns(self) -> int:
+        """Population standard deviation, as numpy.std computes it"""
+        if self.count < 2:
+            return 0
+        return round(math.sqrt(self._m2 / self.count))
+
+    def pace_ns(self) -> int:
+        """Average of the most recent laps in the pace window"""
+        return self._recent_ns // len(self._recent) if self._recent else 0
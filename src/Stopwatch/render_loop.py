@@ -0,0 +1,134 @@
+import time
+import tkinter as tk
+from typing import Callable, List, Optional, Tuple
+
+# How often a loop whose widget is hidden checks whether it is shown again.
+# Unmapping the widget or its toplevel stops the timer outright; this
+# covers other ways of hiding it, such as an unmapped parent frame
+HIDDEN_POLL_MS = 500
+
+
+class RenderLoop:
+    """Frame-paced redraws driven by Tk ``after()`` on the Tk thread.
+
+    ``render()`` is called at most ``fps`` times a second while the loop is
+    running. Frames are scheduled against a fixed timeline, so a slow
+    frame does not make every later frame late; when the loop falls more
+    than a frame behind, the missed frames are dropped instead of being
+    drawn back to back. Nothing is drawn while the widget is not viewable:
+    the timer is cancelled while the widget or its toplevel window is
+    unmapped (e.g. minimized) and restarted when it is mapped again, and
+    while hidden in any other way the loop only polls every
+    HIDDEN_POLL_MS, so a hidden stopwatch costs next to no CPU.
+
+    The toplevel is watched only while the loop runs: its bindings are
+    removed again by ``stop()`` and when the widget is destroyed, so a
+    widget that is rebuilt many times does not pile up callbacks on it.
+    """
+
+    def __init__(self, widget, render: Callable[[], None], fps: int = 30):
+        self.widget = widget
+        self.render = render
+        self.fps = fps
+        self.running = False
+        self._job: Optional[str] = None
+        self._next_frame = 0.0
+        self._toplevel = widget.winfo_toplevel()
+        self._toplevel_bindings: List[Tuple[str, str]] = []  # (sequence, funcid)
+
+        widget.bind("<Map>", self._on_map, add="+")
+        widget.bind("<Unmap>", self._on_unmap, add="+")
+        widget.bind("<Destroy>", self._on_destroy, add="+")
+
+    @property
+    def fps(self) -> int:
+        return self._fps
+
+    @fps.setter
+    def fps(self, value: int):
+        self._fps = max(1, min(int(value), 120))
+        self._interval = 1.0 / self._fps
+
+    def start(self):
+        """Start drawing frames until stop() is called"""
+        if self.running:
+            return
+        self.running = True
+        self._bind_toplevel()
+        self._next_frame = time.perf_counter()
+        self._schedule(0)
+
+    def stop(self):
+        """Stop drawing; the last frame stays on screen"""
+        self.running = False
+        self._cancel()
+        self._unbind_toplevel()
+
+    def _schedule(self, delay_ms: int):
+        self._cancel()
+        self._job = self.widget.after(delay_ms, self._tick)
+
+    def _cancel(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def _tick(self):
+        self._job = None
+        if not self.running:
+            return
+
+        if not self.widget.winfo_viewable():
+            self._schedule(HIDDEN_POLL_MS)
+            return
+
+        self.render()
+        now = time.perf_counter()
+        self._next_frame += self._interval
+        if self._next_frame <= now:
+            # Behind schedule: drop the missed frames
+            self._next_frame = now + self._interval
+        self._schedule(max(1, int((self._next_frame - now) * 1000)))
+
+    def _bind_toplevel(self):
+        # A minimized window unmaps only its toplevel, not the widgets in it
+        if self._toplevel is self.widget or self._toplevel_bindings:
+            return
+        for sequence, handler in (("<Map>", self._on_map), ("<Unmap>", self._on_unmap)):
+            funcid = self._toplevel.bind(sequence, handler, add="+")
+            self._toplevel_bindings.append((sequence, funcid))
+
+    def _unbind_toplevel(self):
+        # Misc.unbind(sequence, funcid) drops every callback of the sequence
+        # before Python 3.13, so only this loop's line is cut from the script
+        for sequence, funcid in self._toplevel_bindings:
+            try:
+                script = self._toplevel.bind(sequence)
+                kept = "\n".join(
+                    line for line in script.splitlines() if line and funcid not in line
+                )
+                self._toplevel.tk.call("bind", str(self._toplevel), sequence, kept)
+            except tk.TclError:
+                pass  # The toplevel is being destroyed along with its bindings
+            try:
+                self._toplevel.deletecommand(funcid)
+            except tk.TclError:
+                pass
+        self._toplevel_bindings.clear()
+
+    def _watches(self, window) -> bool:
+        return window is self.widget or window is self._toplevel
+
+    def _on_map(self, event):
+        # Also replaces a slow hidden poll with an immediate frame
+        if self._watches(event.widget) and self.running:
+            self._next_frame = time.perf_counter()
+            self._schedule(0)
+
+    def _on_unmap(self, event):
+        if self._watches(event.widget):
+            self._cancel()
+
+    def _on_destroy(self, event):
+        if event.widget is self.widget:
+            self.stop()
@@ -2,20 +2,23 @@ import tkinter as tk
 from tkinter import ttk, messagebox, colorchooser, filedialog
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from ttkbootstrap.scrolled import ScrolledFrame
 from ttkbootstrap.tooltip import ToolTip
 import math
-import time
 import json
 import csv
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
-import threading
 import sqlite3
 from typing import Callable, Dict, List, Optional
 import logging
 
+from Stopwatch.lap_stats import LapStatistics
+from Stopwatch.render_loop import RenderLoop
+from Stopwatch.timing import NS_PER_SECOND, StopwatchClock, format_ns
+from ToDo.task_repository import TaskRepository
+from ToDo.virtual_tree import VirtualTreeview
+
 
 class EnhancedStopwatch(ttk.Frame):
     """A professional stopwatch widget with advanced features and elegant UI."""
@@ -45,9 +48,10 @@ class EnhancedStopwatch(ttk.Frame):
             "auto_save": True,
             "theme_mode": "light",
             "export_format": "CSV",
+            "frame_rate": 30,
         }
 
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, task_id: Optional[str] = None, **kwargs):
         super().__init__(parent, **kwargs)
 
         self.pack(fill="both", expand=True)
@@ -57,16 +61,22 @@ class EnhancedStopwatch(ttk.Frame):
 
         # Initialize variables
         self.is_running = False
-        self.start_time = 0
-        self.elapsed_time = 0
-        self.lap_times: List[float] = []
-        self.split_times: List[float] = []
-        self.last_lap_time = 0
-        self.timer_thread: Optional[threading.Thread] = None
+        # Times are integer nanoseconds of monotonic clock time
+        self.clock = StopwatchClock()
+        self.lap_ns: List[int] = []
+        self.split_ns: List[int] = []
+        self.last_lap_ns = 0
+        self.lap_stats = LapStatistics()
         self.precision = 2
         self.auto_save = True
         self.theme_mode = "light"
 
+        # Task the session is timed against, and the elapsed seconds up to
+        # which the session is settled for it: added to its tracked total,
+        # or timed before the task was selected
+        self.task_id = task_id
+        self.tracked_credit = 0.0
+
         # Load settings and initialize database
         self.settings = self.load_settings()
         self.init_database()
@@ -81,6 +91,11 @@ class EnhancedStopwatch(ttk.Frame):
             "on_precision_change": [],
         }
 
+        # Redraws run on the Tk thread, paced by after()
+        self.render_loop = RenderLoop(
+            self, self._render_frame, fps=self.settings.get("frame_rate", 30)
+        )
+
         # Create UI elements
         self.create_widgets()
         self.create_lap_table()
@@ -88,6 +103,7 @@ class EnhancedStopwatch(ttk.Frame):
 
         # Bind keyboard shortcuts
         self._bind_shortcuts()
+        self.bind("<Destroy>", self._on_destroy)
 
         # Load last session if auto-save is enabled
         # if self.auto_save:
@@ -104,18 +120,14 @@ class EnhancedStopwatch(ttk.Frame):
         """Start the stopwatch."""
         if not self.is_running:
             self.is_running = True
-            if not self.start_time:
-                self.start_time = time.time() - self.elapsed_time
-            else:
-                self.start_time = time.time() - self.elapsed_time
+            self.clock.start()
 
             # Update UI
             self.start_stop_button.configure(text="Stop", bootstyle="danger")
             self.status_indicator.configure(bootstyle="success")
 
-            # Start the update thread
-            self.timer_thread = threading.Thread(target=self._update_time, daemon=True)
-            self.timer_thread.start()
+            # Start redrawing the display
+            self.render_loop.start()
 
             # Trigger callbacks
             for callback in self.callbacks["on_start"]:
@@ -124,8 +136,11 @@ class EnhancedStopwatch(ttk.Frame):
     def stop_stopwatch(self):
         """Stop the stopwatch."""
         if self.is_running:
+            elapsed_ns = self.clock.stop()
+            self.render_loop.stop()
+            # Leave the exact stopping time on screen
+            self._update_display(elapsed_ns)
             self.is_running = False
-            self.elapsed_time = time.time() - self.start_time
 
             # Update UI
             self.start_stop_button.configure(text="Start", bootstyle="success")
@@ -138,20 +153,20 @@ class EnhancedStopwatch(ttk.Frame):
     def reset_stopwatch(self):
         """Reset the stopwatch to zero."""
         self.stop_stopwatch()
-        self.elapsed_time = 0
-        self.start_time = 0
-        self.lap_times.clear()
-        self.split_times.clear()
-        self.last_lap_time = 0
+        self.clock.reset()
+        self.lap_ns.clear()
+        self.split_ns.clear()
+        self.last_lap_ns = 0
+        self.lap_stats.reset()
+        self.tracked_credit = 0.0
 
         # Update displays
         self.time_var.set("00:00:00.00")
         self.lap_var.set("Current Lap: 00:00:00.00")
         self._update_statistics()
 
-        # Clear lap table
-        for widget in self.lap_frame.winfo_children():
-            widget.destroy()
+        # Clear lap table; only the visible rows exist as items
+        self.lap_view.refresh()
 
         # Trigger callbacks
         for callback in self.callbacks["on_reset"]:
@@ -160,15 +175,16 @@ class EnhancedStopwatch(ttk.Frame):
     def record_lap(self):
         """Record a lap time."""
         if self.is_running:
-            current_time = time.time() - self.start_time
-            lap_time = current_time - self.last_lap_time
+            split_ns = self.clock.elapsed_ns()
+            lap_ns = split_ns - self.last_lap_ns
 
-            self.lap_times.append(lap_time)
-            self.split_times.append(current_time)
-            self.last_lap_time = current_time
+            self.lap_ns.append(lap_ns)
+            self.split_ns.append(split_ns)
+            self.last_lap_ns = split_ns
+            self.lap_stats.add(lap_ns)
 
             # Add lap to table
-            self._add_lap_to_table(len(self.lap_times), lap_time, current_time)
+            self._add_lap_to_table(len(self.lap_ns) - 1)
 
             # Update statistics
             self._update_statistics()
@@ -177,40 +193,48 @@ class EnhancedStopwatch(ttk.Frame):
             for callback in self.callbacks["on_lap"]:
                 callback()
 
-    def _update_time(self):
-        """Update the time display continuously."""
-        while self.is_running:
-            current_time = time.time() - self.start_time
-            self._update_display(current_time)
-            time.sleep(0.01)  # Small delay to prevent high CPU usage
+    def _render_frame(self):
+        """Draw one frame of the running stopwatch."""
+        self._update_display(self.clock.elapsed_ns())
+
+    @property
+    def lap_times(self) -> List[float]:
+        """Lap times in seconds, for analysis, export and saving."""
+        return [ns / NS_PER_SECOND for ns in self.lap_ns]
+
+    @property
+    def split_times(self) -> List[float]:
+        """Split times in seconds, for analysis, export and saving."""
+        return [ns / NS_PER_SECOND for ns in self.split_ns]
 
-    def _update_display(self, current_time):
+    def _update_display(self, current_ns: int):
         """Update the time display and clock hands."""
         if not self.is_running:
             return
 
         # Update digital display
-        self.time_var.set(self._format_time(current_time))
+        self.time_var.set(self._format_ns(current_ns))
 
         # Update current lap display
-        current_lap_time = current_time - self.last_lap_time
-        self.lap_var.set(f"Current Lap: {self._format_time(current_lap_time)}")
+        current_lap_ns = current_ns - self.last_lap_ns
+        self.lap_var.set(f"Current Lap: {self._format_ns(current_lap_ns)}")
 
         # Update clock hands
-        self._update_clock_hands(current_time)
+        self._update_clock_hands(current_ns)
+
+    def _format_ns(self, ns: int) -> str:
+        """Format nanoseconds in HH:MM:SS.XX format."""
+        return format_ns(ns, self.precision)
 
     def _format_time(self, seconds: float) -> str:
-        """Format time in HH:MM:SS.XX format."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = seconds % 60
-        return f"{hours:02d}:{minutes:02d}:{seconds:0{self.precision + 3}.{self.precision}f}"
+        """Format seconds in HH:MM:SS.XX format."""
+        return format_ns(round(seconds * NS_PER_SECOND), self.precision)
 
-    def _update_clock_hands(self, current_time):
+    def _update_clock_hands(self, current_ns: int):
         """Update the position of clock hands."""
-        # Calculate angles
-        seconds_angle = (current_time % 60) * 6 - 90
-        milliseconds_angle = (current_time * 1000 % 1000) * 0.36 - 90
+        # Calculate angles from the position within the minute and second
+        seconds_angle = current_ns % (60 * NS_PER_SECOND) * 6 / NS_PER_SECOND - 90
+        milliseconds_angle = current_ns % NS_PER_SECOND * 360 / NS_PER_SECOND - 90
 
         # Update second hand
         x = 100 + 80 * math.cos(math.radians(seconds_angle))
@@ -223,59 +247,47 @@ class EnhancedStopwatch(ttk.Frame):
         self.canvas.coords(self.millisecond_hand, 100, 100, x, y)
 
     def _update_statistics(self):
-        """Update statistics display."""
-        if self.lap_times:
-            self.stats_vars["best_lap"].set(self._format_time(min(self.lap_times)))
-            self.stats_vars["average_lap"].set(
-                self._format_time(sum(self.lap_times) / len(self.lap_times))
-            )
-            self.stats_vars["worst_lap"].set(self._format_time(max(self.lap_times)))
-            self.stats_vars["total_laps"].set(str(len(self.lap_times)))
-            self.stats_vars["total_time"].set(self._format_time(sum(self.lap_times)))
-
-            if len(self.lap_times) > 1:
-                import numpy as np
-
-                std_dev = np.std(self.lap_times)
-                self.stats_vars["std_deviation"].set(self._format_time(std_dev))
+        """Update statistics display from the running lap statistics."""
+        stats = self.lap_stats
+        if stats.count:
+            self.stats_vars["best_lap"].set(self._format_ns(stats.min_ns))
+            self.stats_vars["average_lap"].set(self._format_ns(stats.mean_ns()))
+            self.stats_vars["worst_lap"].set(self._format_ns(stats.max_ns))
+            self.stats_vars["total_laps"].set(str(stats.count))
+            self.stats_vars["total_time"].set(self._format_ns(stats.total_ns))
+
+            if stats.count > 1:
+                self.stats_vars["std_deviation"].set(self._format_ns(stats.std_ns()))
 
             # Calculate current pace (average of last 3 laps)
-            recent_laps = (
-                self.lap_times[-3:] if len(self.lap_times) >= 3 else self.lap_times
-            )
-            current_pace = sum(recent_laps) / len(recent_laps)
-            self.stats_vars["current_pace"].set(self._format_time(current_pace))
-
-    def _add_lap_to_table(self, lap_number: int, lap_time: float, split_time: float):
-        """Add a new lap to the lap table."""
-        lap_frame = ttk.Frame(self.lap_frame)
-        lap_frame.pack(fill="x", padx=5, pady=2)
-
-        # Lap number
-        ttk.Label(lap_frame, text=f"{lap_number}", width=5).pack(
-            side="left", expand=True
-        )
-
-        # Lap time
-        ttk.Label(lap_frame, text=self._format_time(lap_time), width=12).pack(
-            side="left", expand=True
-        )
-
-        # Split time
-        ttk.Label(lap_frame, text=self._format_time(split_time), width=12).pack(
-            side="left", expand=True
+            self.stats_vars["current_pace"].set(self._format_ns(stats.pace_ns()))
+
+    def _add_lap_to_table(self, index: int):
+        """Show a newly recorded lap, following the end of the table."""
+        view = self.lap_view
+        at_end = view.offset + view.visible_rows >= view.total
+        view.insert(index)
+        if at_end:
+            view.scroll_to(view.total)
+
+    def _render_lap_row(self, index: int):
+        """Table row for the lap at index, computed from the lap arrays."""
+        lap_ns = self.lap_ns[index]
+        split_ns = self.split_ns[index]
+
+        # Pace (compared to the average lap so far)
+        pace_diff = lap_ns - split_ns // (index + 1)
+        pace_text = f"{'+' if pace_diff > 0 else ''}{self._format_ns(pace_diff)}"
+
+        # Laps up to this one add up to its split, so that is also the total
+        values = (
+            index + 1,
+            self._format_ns(lap_ns),
+            self._format_ns(split_ns),
+            self._format_ns(split_ns),
+            pace_text,
         )
-
-        # Total time
-        ttk.Label(
-            lap_frame, text=self._format_time(sum(self.lap_times)), width=12
-        ).pack(side="left", expand=True)
-
-        # Pace (compared to average)
-        avg_pace = sum(self.lap_times) / len(self.lap_times)
-        pace_diff = lap_time - avg_pace
-        pace_text = f"{'+' if pace_diff > 0 else ''}{self._format_time(pace_diff)}"
-        ttk.Label(lap_frame, text=pace_text, width=12).pack(side="left", expand=True)
+        return values, ()
 
     def _setup_logging(self):
         """Initialize logging configuration."""
@@ -301,10 +313,27 @@ class EnhancedStopwatch(ttk.Frame):
                     end_time TEXT,
                     total_time REAL,
                     lap_times TEXT,
-                    split_times TEXT
+                    split_times TEXT,
+                    task_id TEXT
                 )
             """
             )
+            # Databases from before sessions could be linked to a task
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if "task_id" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN task_id TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sessions_task_id ON sessions (task_id)"
+            )
+
+        # Tracked time is added to the task itself, so the task list can
+        # show it without summing sessions
+        self.tasks = TaskRepository("mindflow_tasks.db")
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.render_loop.stop()
+            self.tasks.close()
 
     def create_widgets(self):
         """Create all UI widgets with modern styling."""
@@ -367,6 +396,22 @@ class EnhancedStopwatch(ttk.Frame):
         )
         self.status_indicator.pack(side="right")
 
+        # Task the session is timed against
+        ttk.Label(self.status_frame, text="Task:").pack(side="left")
+        self.task_var = tk.StringVar()
+        self.task_choices = []
+        self.task_picker = ttk.Combobox(
+            self.status_frame,
+            textvariable=self.task_var,
+            width=40,
+            postcommand=self._load_task_choices,
+        )
+        self.task_picker.pack(side="left", padx=5)
+        self.task_picker.bind("<<ComboboxSelected>>", self._on_task_selected)
+        if self.task_id:
+            task = self.tasks.get(self.task_id)
+            self.task_var.set(task.title if task else "")
+
         # Main time display
         self.time_var = tk.StringVar(value="00:00:00.00")
         self.time_label = ttk.Label(
@@ -397,6 +442,29 @@ class EnhancedStopwatch(ttk.Frame):
         )
         self.lap_label.pack()
 
+    def _load_task_choices(self):
+        """Offer pending tasks, narrowed by whatever is typed in the picker"""
+        text = self.task_var.get().strip()
+        self.task_choices = self.tasks.filter(
+            "Pending", search=text or None, sort=None if text else "title", limit=50
+        )
+        self.task_picker.configure(values=[task.title for task in self.task_choices])
+
+    def _on_task_selected(self, event):
+        index = self.task_picker.current()
+        if 0 <= index < len(self.task_choices):
+            self.set_task(self.task_choices[index].id)
+
+    def set_task(self, task_id: Optional[str]):
+        """Time the current session against a task, or against none"""
+        if task_id != self.task_id:
+            elapsed = self.clock.elapsed_ns() / NS_PER_SECOND
+            if self.task_id and elapsed > self.tracked_credit:
+                # Settle the task being left; time from here on is the new one's
+                self.tasks.add_tracked_time(self.task_id, elapsed - self.tracked_credit)
+            self.task_id = task_id
+            self.tracked_credit = elapsed
+
     def create_middle_section(self):
         """Create the middle section with analog clock and statistics."""
         middle_frame = ttk.Frame(self.main_container)
@@ -642,30 +710,37 @@ class EnhancedStopwatch(ttk.Frame):
                 self.export_button = btn
 
     def create_lap_table(self):
-        """Create an enhanced lap time table with sorting capabilities."""
-        self.lap_frame = ScrolledFrame(self.main_container, autohide=True, height=150)
-        self.lap_frame.pack(fill="both", expand=True, pady=10)
-
-        # Enhanced table headers with sorting
-        headers_frame = ttk.Frame(self.lap_frame)
-        headers_frame.pack(fill="x", padx=5, pady=5)
-
+        """Create a lap time table that only builds the rows on screen."""
         headers = [
-            ("№", "number"),
-            ("Lap Time", "lap"),
-            ("Split Time", "split"),
-            ("Total Time", "total"),
-            ("Pace", "pace"),
+            ("number", "№", 50),
+            ("lap", "Lap Time", 120),
+            ("split", "Split Time", 120),
+            ("total", "Total Time", 120),
+            ("pace", "Pace", 120),
         ]
 
-        for header, sort_key in headers:
-            header_btn = ttk.Button(
-                headers_frame,
-                text=header,
-                bootstyle="link",
-                command=lambda k=sort_key: self.sort_laps(k),
-            )
-            header_btn.pack(side="left", expand=True)
+        # Rows are lap indexes, rendered on demand from the lap arrays
+        self.lap_view = VirtualTreeview(
+            self.main_container,
+            row_key=lambda index: index,
+            render_row=self._render_lap_row,
+            columns=[column for column, _, _ in headers],
+            show="headings",
+            height=6,
+            selectmode="browse",
+        )
+        self.lap_view.pack(fill="both", expand=True, pady=10)
+
+        for column, header, width in headers:
+            self.lap_view.tree.heading(column, text=header)
+            self.lap_view.tree.column(column, width=width, anchor="center")
+
+        self.lap_view.set_source(
+            count=lambda: len(self.lap_ns),
+            fetch=lambda offset, limit: list(
+                range(offset, min(offset + limit, len(self.lap_ns)))
+            ),
+        )
 
     def _bind_shortcuts(self):
         """Bind keyboard shortcuts with enhanced functionality."""
@@ -732,6 +807,36 @@ class EnhancedStopwatch(ttk.Frame):
         )
         auto_save_check.pack(anchor="w", pady=5)
 
+        # Display frame rate
+        ttk.Label(parent, text="Frame Rate (fps):").pack(anchor="w", pady=5)
+        frame_rate_var = tk.IntVar(value=self.render_loop.fps)
+
+        def apply_frame_rate(event=None):
+            # Typed values arrive on Return or focus loss, arrows via command
+            try:
+                self.update_frame_rate(frame_rate_var.get())
+            except tk.TclError:
+                pass  # Not a number; show the current rate again
+            frame_rate_var.set(self.render_loop.fps)
+
+        frame_rate_spinbox = ttk.Spinbox(
+            parent,
+            from_=1,
+            to=120,
+            textvariable=frame_rate_var,
+            width=5,
+            command=apply_frame_rate,
+        )
+        frame_rate_spinbox.bind("<Return>", apply_frame_rate)
+        frame_rate_spinbox.bind("<FocusOut>", apply_frame_rate)
+        frame_rate_spinbox.pack(anchor="w", pady=5)
+
+    def update_frame_rate(self, fps: int):
+        """Change how often the running display is redrawn."""
+        self.render_loop.fps = fps
+        self.settings["frame_rate"] = self.render_loop.fps
+        self.save_settings()
+
     def _create_appearance_settings(self, parent):
         """Create appearance settings controls."""
         # Theme selection
@@ -869,19 +974,20 @@ class EnhancedStopwatch(ttk.Frame):
         return [
             {
                 "lap_number": i + 1,
-                "lap_time": self.lap_times[i],
-                "split_time": self.split_times[i],
-                "total_time": sum(self.lap_times[: i + 1]),
-                "timestamp": datetime.fromtimestamp(
-                    self.start_time + self.split_times[i]
-                ).strftime("%Y-%m-%d %H:%M:%S"),
+                "lap_time": self.lap_ns[i] / NS_PER_SECOND,
+                "split_time": self.split_ns[i] / NS_PER_SECOND,
+                "total_time": self.split_ns[i] / NS_PER_SECOND,
+                # The only use of the wall clock: when the lap happened
+                "timestamp": self.clock.wall_time(self.split_ns[i]).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                ),
             }
-            for i in range(len(self.lap_times))
+            for i in range(len(self.lap_ns))
         ]
 
     def save_session(self):
         """Save current session to database."""
-        if not self.lap_times:
+        if not self.lap_ns:
             messagebox.showwarning("No Data", "No lap times to save.")
             return
 
@@ -894,18 +1000,32 @@ class EnhancedStopwatch(ttk.Frame):
                         end_time,
                         total_time,
                         lap_times,
-                        split_times
-                    ) VALUES (?, ?, ?, ?, ?)
+                        split_times,
+                        task_id
+                    ) VALUES (?, ?, ?, ?, ?, ?)
                 """,
                     (
-                        datetime.fromtimestamp(self.start_time).isoformat(),
-                        datetime.fromtimestamp(time.time()).isoformat(),
-                        sum(self.lap_times),
+                        self.clock.wall_time().isoformat(),
+                        datetime.now().isoformat(),
+                        self.last_lap_ns / NS_PER_SECOND,
                         json.dumps(self.lap_times),
                         json.dumps(self.split_times),
+                        self.task_id,
                     ),
                 )
-            messagebox.showinfo("Success", "Session saved successfully!")
+
+            message = "Session saved successfully!"
+            if self.task_id:
+                # Only the time not already credited by an earlier save,
+                # including the lap still running
+                total_time = self.clock.elapsed_ns() / NS_PER_SECOND
+                tracked = self.tasks.add_tracked_time(
+                    self.task_id, total_time - self.tracked_credit
+                )
+                self.tracked_credit = total_time
+                if tracked is not None:
+                    message += f"\nTotal tracked on task: {self._format_time(tracked)}"
+            messagebox.showinfo("Success", message)
         except Exception as e:
             self.logger.error(f"Error saving session: {e}")
             messagebox.showerror("Save Error", f"Error saving session: {str(e)}")
@@ -916,7 +1036,7 @@ class EnhancedStopwatch(ttk.Frame):
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.execute(
                     """
-                    SELECT start_time, total_time, lap_times, split_times
+                    SELECT start_time, total_time, lap_times, split_times, task_id
                     FROM sessions
                     ORDER BY start_time DESC
                 """
@@ -939,20 +1059,27 @@ class EnhancedStopwatch(ttk.Frame):
 
                 session = sessions[selection[0]]
                 self.reset_stopwatch()
-                self.start_time = datetime.fromisoformat(session[0]).timestamp()
-                self.lap_times = json.loads(session[2])
-                self.split_times = json.loads(session[3])
-                self.elapsed_time = sum(self.lap_times)
+                self.lap_ns = [round(t * NS_PER_SECOND) for t in json.loads(session[2])]
+                self.split_ns = [
+                    round(t * NS_PER_SECOND) for t in json.loads(session[3])
+                ]
+                self.last_lap_ns = self.split_ns[-1] if self.split_ns else 0
+                for lap_ns in self.lap_ns:
+                    self.lap_stats.add(lap_ns)
+                elapsed_ns = sum(self.lap_ns)
+                self.clock.restore(elapsed_ns, datetime.fromisoformat(session[0]))
+                # The loaded session was credited to its task when saved
+                self.task_id = session[4]
+                self.tracked_credit = elapsed_ns / NS_PER_SECOND
+                task = self.tasks.get(self.task_id) if self.task_id else None
+                self.task_var.set(task.title if task else "")
 
                 # Update display
-                self._update_display(self.elapsed_time)
+                self._update_display(elapsed_ns)
                 self._update_statistics()
 
-                # Recreate lap table
-                for i, (lap_time, split_time) in enumerate(
-                    zip(self.lap_times, self.split_times)
-                ):
-                    self._add_lap_to_table(i + 1, lap_time, split_time)
+                # Show the loaded laps
+                self.lap_view.refresh()
 
                 session_window.destroy()
                 messagebox.showinfo("Success", "Session loaded successfully!")
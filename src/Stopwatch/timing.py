@@ -0,0 +1,73 @@
+import time
+from datetime import datetime
+from typing import Optional
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class StopwatchClock:
+    """Monotonic stopwatch time in integer nanoseconds.
+
+    Elapsed time is measured with ``time.perf_counter_ns()``, which never
+    jumps when the wall clock is adjusted and keeps full resolution however
+    long a session runs. The wall clock is read only to anchor the
+    session for export timestamps: ``wall_anchor_ns`` is the wall time at
+    which elapsed time would have been zero, moved forward on each resume
+    so pauses are not counted.
+    """
+
+    def __init__(self):
+        self.running = False
+        self._accumulated_ns = 0  # elapsed before the current run
+        self._started_ns = 0  # perf_counter_ns() at the current run's start
+        self.wall_anchor_ns: Optional[int] = None
+
+    def start(self):
+        if self.running:
+            return
+        self._started_ns = time.perf_counter_ns()
+        self.wall_anchor_ns = time.time_ns() - self._accumulated_ns
+        self.running = True
+
+    def stop(self) -> int:
+        """Pause the clock and return the elapsed nanoseconds"""
+        if self.running:
+            self._accumulated_ns += time.perf_counter_ns() - self._started_ns
+            self.running = False
+        return self._accumulated_ns
+
+    def reset(self):
+        self.running = False
+        self._accumulated_ns = 0
+        self.wall_anchor_ns = None
+
+    def restore(self, elapsed_ns: int, started_at: datetime):
+        """Put a stopped clock back to a saved session's state"""
+        self.running = False
+        self._accumulated_ns = elapsed_ns
+        self.wall_anchor_ns = int(started_at.timestamp() * NS_PER_SECOND)
+
+    def elapsed_ns(self) -> int:
+        if self.running:
+            return self._accumulated_ns + time.perf_counter_ns() - self._started_ns
+        return self._accumulated_ns
+
+    def wall_time(self, elapsed_ns: int = 0) -> datetime:
+        """Wall-clock time at which the clock read elapsed_ns"""
+        anchor_ns = self.wall_anchor_ns
+        if anchor_ns is None:
+            anchor_ns = time.time_ns()
+        return datetime.fromtimestamp((anchor_ns + elapsed_ns) / NS_PER_SECOND)
+
+
+def format_ns(ns: int, precision: int = 2) -> str:
+    """HH:MM:SS.xx with precision fraction digits, using integer math only"""
+    sign = "-" if ns < 0 else ""
+    ns = abs(ns)
+    seconds, fraction = divmod(ns, NS_PER_SECOND)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    text = f"{sign}{hours:02d}:{minutes:02d}:{seconds:02d}"
+    if precision > 0:
+        text += f".{fraction // 10 ** (9 - precision):0{precision}d}"
+    return text
@@ -1,55 +1,32 @@
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from ttkbootstrap.dialogs import MessageDialog
-from datetime import datetime, timedelta
+from ttkbootstrap.dialogs import MessageDialog, Querybox
+from datetime import timedelta
+import csv
 import json
-from tkinter import messagebox
-from typing import Optional, Dict, List
-import uuid
-
-
-class Task:
-    def __init__(
-        self,
-        title: str,
-        description: str = "",
-        due_date: Optional[str] = None,
-        priority: str = "Medium",
-        status: str = "Pending",
-    ):
-
-        self.id = str(uuid.uuid4())
-        self.title = title
-        self.description = description
-        self.due_date = due_date
-        self.priority = priority
-        self.status = status
-        self.created_at = datetime.now().isoformat()
-        self.completed_at: Optional[str] = None
-
-    def to_dict(self) -> Dict:
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "due_date": self.due_date,
-            "priority": self.priority,
-            "status": self.status,
-            "created_at": self.created_at,
-            "completed_at": self.completed_at,
-        }
+import sqlite3
+from tkinter import filedialog, messagebox
+from typing import List, Optional
+
+from plyer import notification
+
+from ToDo.reminders import ReminderScheduler
+
+from ToDo.task import parse_timestamp
+from ToDo.task_repository import TaskRepository
+from ToDo.task_transfer import TaskExporter, TaskImporter
+from ToDo.todo_core import (
+    DependencyCycleError,
+    Recurrence,
+    Task,
+    TaskArchive,
+    TodoCore,
+)
+from ToDo.virtual_tree import VirtualTreeview
 
-    @classmethod
-    def from_dict(cls, data: Dict) -> "Task":
-        task = cls(data["title"])
-        task.id = data["id"]
-        task.description = data["description"]
-        task.due_date = data["due_date"]
-        task.priority = data["priority"]
-        task.status = data["status"]
-        task.created_at = data["created_at"]
-        task.completed_at = data["completed_at"]
-        return task
+
+# Completed tasks older than this move to the archive on startup
+ARCHIVE_AFTER_DAYS = 30
 
 
 class EnhancedTodoList:
@@ -61,10 +38,18 @@ class EnhancedTodoList:
         if self.is_root_window:
             self.master.title("Enhanced ToDoist")
 
-        self.tasks: List[Task] = []
+        self.store = TaskRepository("mindflow_tasks.db", autosave_delay=0.5)
         self.setup_styles()
         self.create_layout()
         self.load_tasks()
+        self.core = TodoCore(self.store)
+        self.statistics = self.core.statistics
+        self.archive = TaskArchive("mindflow_archive.jsonl.gz")
+        self.archive_old_tasks()
+        self.reminders = ReminderScheduler(
+            self.master, lookup=self.store.get, notify=self.show_reminder
+        )
+        self.reminders.load(self.store.pending_deadlines())
         self.update_view()
 
     def setup_styles(self):
@@ -87,6 +72,7 @@ class EnhancedTodoList:
             "medium": "#2980B9",
             "low": "#7F8C8D",
             "completed": "#27AE60",
+            "blocked": "#95A5A6",
         }
 
     def create_layout(self):
@@ -94,6 +80,7 @@ class EnhancedTodoList:
         # Main container with padding
         self.main_frame = ttk.Frame(self.master, padding="10")
         self.main_frame.pack(fill=BOTH, expand=YES)
+        self.main_frame.bind("<Destroy>", self.on_destroy)
 
         # Header with title
         header_frame = ttk.Frame(self.main_frame)
@@ -127,21 +114,35 @@ class EnhancedTodoList:
 
     def create_task_tree(self):
         """Create and configure the task treeview"""
-        columns = ("id", "title", "priority", "due_date", "status")
-        self.tree = ttk.Treeview(
+        columns = ("id", "title", "priority", "due_date", "status", "tracked")
+        # Only the rows on screen are materialized; see VirtualTreeview
+        self.task_view = VirtualTreeview(
             self.main_frame,
+            row_key=lambda task: task.id,
+            render_row=self.render_task_row,
             columns=columns,
             show="headings",
             style="Task.Treeview",
             height=15,
+            selectmode="extended",
         )
+        self.tree = self.task_view.tree
 
-        # Configure columns
+        # Configure columns; clicking a heading sorts by it
         self.tree.heading("id", text="ID")
-        self.tree.heading("title", text="Task")
-        self.tree.heading("priority", text="Priority")
-        self.tree.heading("due_date", text="Due Date")
-        self.tree.heading("status", text="Status")
+        self.tree.heading("tracked", text="Tracked")
+        self.column_titles = {
+            "title": "Task",
+            "priority": "Priority",
+            "due_date": "Due Date",
+            "status": "Status",
+        }
+        self.sort_column: Optional[str] = None
+        self.sort_descending = False
+        for column, text in self.column_titles.items():
+            self.tree.heading(
+                column, text=text, command=lambda c=column: self.sort_by(c)
+            )
 
         # Hide ID column
         self.tree.column("id", width=0, stretch=NO)
@@ -149,24 +150,20 @@ class EnhancedTodoList:
         self.tree.column("priority", width=100, anchor=CENTER)
         self.tree.column("due_date", width=150, anchor=CENTER)
         self.tree.column("status", width=100, anchor=CENTER)
+        self.tree.column("tracked", width=80, anchor=CENTER)
 
         for tag, color in self.tree_tags.items():
             self.tree.tag_configure(tag, foreground=color)
 
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(
-            self.main_frame, orient=VERTICAL, command=self.tree.yview
-        )
-        self.tree.configure(yscrollcommand=scrollbar.set)
-
-        # Pack elements
-        self.tree.pack(side=LEFT, fill=BOTH, expand=YES)
-        scrollbar.pack(side=RIGHT, fill=Y)
+        self.task_view.pack(side=LEFT, fill=BOTH, expand=YES)
 
         # Bind double-click event for task details
         self.tree.bind(
             "<Double-1>", lambda e: self.show_task_dialog(self.get_selected_task())
         )
+        self.tree.bind("<Control-z>", lambda e: self.undo())
+        self.tree.bind("<Control-y>", lambda e: self.redo())
+        self.tree.bind("<Control-Z>", lambda e: self.redo())
 
     def create_action_buttons(self):
         """Create action buttons frame"""
@@ -187,6 +184,45 @@ class EnhancedTodoList:
             command=self.delete_task,
         ).pack(side=LEFT, padx=5)
 
+        priority_button = ttk.Menubutton(
+            button_frame, text="Priority", bootstyle="warning-outline"
+        )
+        priority_menu = ttk.Menu(priority_button, tearoff=0)
+        for priority in ("High", "Medium", "Low"):
+            priority_menu.add_command(
+                label=priority, command=lambda p=priority: self.set_priority(p)
+            )
+        priority_button["menu"] = priority_menu
+        priority_button.pack(side=LEFT, padx=5)
+
+        ttk.Button(
+            button_frame,
+            text="Reschedule",
+            bootstyle="info-outline",
+            command=self.reschedule_tasks,
+        ).pack(side=LEFT, padx=5)
+
+        ttk.Button(
+            button_frame,
+            text="Undo",
+            bootstyle="secondary-outline",
+            command=self.undo,
+        ).pack(side=LEFT, padx=5)
+
+        ttk.Button(
+            button_frame,
+            text="Redo",
+            bootstyle="secondary-outline",
+            command=self.redo,
+        ).pack(side=LEFT, padx=5)
+
+        ttk.Button(
+            button_frame,
+            text="History",
+            bootstyle="info-outline",
+            command=self.show_history,
+        ).pack(side=RIGHT, padx=5)
+
         ttk.Button(
             button_frame,
             text="Statistics",
@@ -194,6 +230,20 @@ class EnhancedTodoList:
             command=self.show_statistics,
         ).pack(side=RIGHT, padx=5)
 
+        ttk.Button(
+            button_frame,
+            text="Export",
+            bootstyle="secondary-outline",
+            command=self.export_tasks,
+        ).pack(side=RIGHT, padx=5)
+
+        ttk.Button(
+            button_frame,
+            text="Import",
+            bootstyle="secondary-outline",
+            command=self.import_tasks,
+        ).pack(side=RIGHT, padx=5)
+
     def create_filters(self):
         """Create filtering options"""
         filter_frame = ttk.LabelFrame(self.main_frame, text="Filters", padding=10)
@@ -221,18 +271,65 @@ class EnhancedTodoList:
         )
         priority_cb.pack(side=LEFT, padx=5)
 
+        # Project filter; a project includes its subprojects
+        self.project_var = ttk.StringVar(value="All")
+        ttk.Label(filter_frame, text="Project:").pack(side=LEFT, padx=5)
+        project_cb = ttk.Combobox(
+            filter_frame,
+            textvariable=self.project_var,
+            values=["All"],
+            width=15,
+        )
+        project_cb.configure(
+            postcommand=lambda: project_cb.configure(
+                values=["All", *self.store.all_projects()]
+            )
+        )
+        project_cb.pack(side=LEFT, padx=5)
+
+        # Tag filter; tasks must carry every comma separated tag
+        self.tags_var = ttk.StringVar()
+        ttk.Label(filter_frame, text="Tags:").pack(side=LEFT, padx=5)
+        tags_entry = ttk.Entry(filter_frame, textvariable=self.tags_var, width=15)
+        tags_entry.pack(side=LEFT, padx=5)
+
+        # Full-text search over titles and descriptions
+        self.search_var = ttk.StringVar()
+        self._search_job = None
+        ttk.Label(filter_frame, text="Search:").pack(side=LEFT, padx=5)
+        search_entry = ttk.Entry(filter_frame, textvariable=self.search_var)
+        search_entry.pack(side=LEFT, fill=X, expand=YES, padx=5)
+
         # Bind filter changes
         status_cb.bind("<<ComboboxSelected>>", lambda e: self.update_view())
         priority_cb.bind("<<ComboboxSelected>>", lambda e: self.update_view())
+        project_cb.bind("<<ComboboxSelected>>", lambda e: self.update_view())
+        tags_entry.bind("<KeyRelease>", lambda e: self.schedule_search())
+        search_entry.bind("<KeyRelease>", lambda e: self.schedule_search())
+
+    def schedule_search(self):
+        """Re-run the search shortly after the user stops typing"""
+        if self._search_job is not None:
+            self.master.after_cancel(self._search_job)
+        self._search_job = self.master.after(200, self.run_search)
+
+    def run_search(self):
+        self._search_job = None
+        self.update_view()
 
     def get_selected_task(self) -> Optional[Task]:
         """Get the currently selected task"""
-        selected = self.tree.selection()
+        selected = self.task_view.selected_keys()
         if not selected:
             return None
 
-        task_id = self.tree.item(selected[0])["values"][0]
-        return next((task for task in self.tasks if task.id == task_id), None)
+        return self.store.get(selected[0])
+
+    def get_selected_tasks(self) -> List[Task]:
+        """Get every selected task; after Ctrl+A, every task in the view"""
+        if self.task_view.all_selected:
+            return self.query.fetch()
+        return self.store.get_many(self.task_view.selected_keys())
 
     # Update the show_task_dialog method to properly use Querybox
     def show_task_dialog(self, task: Optional[Task] = None):
@@ -242,7 +339,7 @@ class EnhancedTodoList:
         # Create custom dialog instead of using Querybox
         details_dialog = ttk.Toplevel(self.master)
         details_dialog.title(dialog_title)
-        details_dialog.geometry("400x300")
+        details_dialog.geometry("400x540")
 
         # Center the dialog
         details_dialog.update_idletasks()
@@ -286,7 +383,56 @@ class EnhancedTodoList:
             values=["High", "Medium", "Low"],
             state="readonly",
         )
-        priority_combo.pack(fill=X, pady=(0, 20))
+        priority_combo.pack(fill=X, pady=(0, 10))
+
+        # Project, e.g. Work/Website
+        ttk.Label(form_frame, text="Project (use / for subprojects):").pack(anchor=W)
+        project_combo = ttk.Combobox(
+            form_frame, values=self.store.all_projects()
+        )
+        project_combo.pack(fill=X, pady=(0, 10))
+        if task and task.project:
+            project_combo.insert(0, task.project)
+
+        # Tags
+        ttk.Label(form_frame, text="Tags (comma separated):").pack(anchor=W)
+        tags_entry = ttk.Entry(form_frame)
+        tags_entry.pack(fill=X, pady=(0, 10))
+        if task and task.tags:
+            tags_entry.insert(0, ", ".join(sorted(task.tag_set)))
+
+        # Dependencies, by title; the task is blocked until they are completed
+        ttk.Label(form_frame, text="Depends on (task titles, comma separated):").pack(
+            anchor=W
+        )
+        depends_entry = ttk.Entry(form_frame)
+        depends_entry.pack(fill=X, pady=(0, 10))
+        if task and task.depends_on:
+            depends_entry.insert(
+                0, ", ".join(dep.title for dep in self.store.get_many(task.depends_on))
+            )
+        depends_text = depends_entry.get()
+
+        # Repeat
+        ttk.Label(form_frame, text="Repeat:").pack(anchor=W)
+        repeat_frame = ttk.Frame(form_frame)
+        repeat_frame.pack(fill=X, pady=(0, 20))
+        rule = task.rule if task else None
+        repeat_var = ttk.StringVar(
+            value=rule.frequency.capitalize() if rule else "Never"
+        )
+        ttk.Combobox(
+            repeat_frame,
+            textvariable=repeat_var,
+            values=["Never", "Daily", "Weekly", "Monthly"],
+            state="readonly",
+            width=10,
+        ).pack(side=LEFT)
+        ttk.Label(repeat_frame, text="every").pack(side=LEFT, padx=5)
+        interval_var = ttk.StringVar(value=str(rule.interval) if rule else "1")
+        ttk.Spinbox(
+            repeat_frame, from_=1, to=365, textvariable=interval_var, width=5
+        ).pack(side=LEFT)
 
         def save_task():
             title = title_entry.get().strip()
@@ -294,22 +440,72 @@ class EnhancedTodoList:
                 messagebox.showwarning("Invalid Input", "Task title cannot be empty!")
                 return
 
+            recurrence = None
+            if repeat_var.get() != "Never":
+                try:
+                    recurrence = str(
+                        Recurrence(
+                            repeat_var.get(),
+                            start=parse_timestamp(due_date_entry.get()),
+                            interval=int(interval_var.get()),
+                        )
+                    )
+                except ValueError:
+                    messagebox.showwarning(
+                        "Invalid Input",
+                        "Repeating tasks need a valid due date and interval!",
+                    )
+                    return
+
+            if depends_entry.get() == depends_text:
+                dependencies = task.dependencies if task else None
+            else:
+                try:
+                    dependencies = self.find_dependencies(depends_entry.get(), task)
+                except ValueError as e:
+                    messagebox.showwarning("Invalid Input", str(e))
+                    return
+
             if task:  # Editing existing task
-                task.title = title
-                task.description = description_text.get("1.0", "end-1c")
-                task.due_date = due_date_entry.get()
-                task.priority = priority_var.get()
+                try:
+                    self.core.edit(
+                        task,
+                        title=title,
+                        description=description_text.get("1.0", "end-1c"),
+                        due_date=due_date_entry.get(),
+                        priority=priority_var.get(),
+                        recurrence=recurrence,
+                        dependencies=dependencies,
+                        tags=tags_entry.get(),
+                        project=project_combo.get(),
+                    )
+                except DependencyCycleError:
+                    messagebox.showwarning(
+                        "Invalid Input",
+                        "Those dependencies would make the task wait on itself!",
+                    )
+                    return
+                self.reminders.schedule(task)
+                self.show_changed_task(task)
             else:  # Creating new task
                 new_task = Task(
                     title=title,
                     description=description_text.get("1.0", "end-1c"),
                     due_date=due_date_entry.get(),
                     priority=priority_var.get(),
+                    recurrence=recurrence,
+                    dependencies=dependencies,
+                    tags=tags_entry.get(),
+                    project=project_combo.get(),
                 )
-                self.tasks.append(new_task)
+                self.core.add(new_task)
+                self.reminders.schedule(new_task)
+                if self.search_var.get().strip() or self.sort_column:
+                    # Ranked or sorted results are not in insertion order
+                    self.task_view.refresh()
+                else:
+                    self.task_view.insert(new_task)
 
-            self.save_tasks()
-            self.update_view()
             details_dialog.destroy()
 
         # Buttons
@@ -331,108 +527,395 @@ class EnhancedTodoList:
         details_dialog.transient(self.master)
         details_dialog.grab_set()
         self.master.wait_window(details_dialog)
+    def find_dependencies(self, text: str, task: Optional[Task]) -> Optional[str]:
+        """Stored dependencies for comma separated task titles.
+
+        Raises ValueError if a title matches no other task, or several.
+        """
+        task_ids = []
+        for title in (part.strip() for part in text.split(",")):
+            if not title:
+                continue
+            matches = [
+                other
+                for other in self.store.filter(search=title, limit=200)
+                if other.title.casefold() == title.casefold()
+                and (task is None or other.id != task.id)
+            ]
+            if not matches:
+                raise ValueError(f"No other task is titled {title!r}")
+            if len(matches) > 1:
+                raise ValueError(f"Several tasks are titled {title!r}")
+            task_ids.append(matches[0].id)
+        return ",".join(task_ids) or None
+
     def complete_task(self):
-        """Mark selected task as completed"""
-        task = self.get_selected_task()
-        if not task:
+        """Mark selected tasks as completed"""
+        tasks = self.get_selected_tasks()
+        if not tasks:
             messagebox.showwarning("No Selection", 
             "Please select a task to complete")
             return
 
-        task.status = "Completed"
-        task.completed_at = datetime.now().isoformat()
-        self.save_tasks()
-        self.update_view()
+        if len(tasks) == 1:
+            self.core.complete(tasks[0])
+            self.reminders.schedule(tasks[0])
+            self.show_changed_task(tasks[0])
+            return
+
+        self.core.complete_many(tasks)
+        for task in tasks:
+            self.reminders.schedule(task)
+        self.show_bulk_change()
     def delete_task(self):
-        """Delete selected task"""
-        task = self.get_selected_task()
-        if not task:
+        """Delete selected tasks"""
+        tasks = self.get_selected_tasks()
+        if not tasks:
             messagebox.showwarning("No Selection", 
                 "Please select a task to delete")
             return
 
-        if messagebox.askyesno(
-            "Confirm Delete", 
+        question = (
             "Are you sure you want to delete this task?"
-        ):
-            self.tasks.remove(task)
-            self.save_tasks()
-            self.update_view()
+            if len(tasks) == 1
+            else f"Are you sure you want to delete {len(tasks)} tasks?"
+        )
+        if messagebox.askyesno("Confirm Delete", question):
+            self.core.delete_many([task.id for task in tasks])
+            for task in tasks:
+                self.reminders.cancel(task.id)
+            if len(tasks) == 1:
+                self.task_view.remove(tasks[0].id)
+            else:
+                self.show_bulk_change()
+
+    def set_priority(self, priority: str):
+        """Reprioritize selected tasks"""
+        tasks = self.get_selected_tasks()
+        if not tasks:
+            messagebox.showwarning("No Selection", "Please select tasks first")
+            return
+
+        self.core.edit_many(
+            [(task, {"priority": priority}) for task in tasks],
+            label=f"Set priority of {len(tasks)} tasks to {priority}",
+        )
+        self.show_bulk_change()
+
+    def reschedule_tasks(self):
+        """Move selected tasks to a new due date"""
+        tasks = self.get_selected_tasks()
+        if not tasks:
+            messagebox.showwarning("No Selection", "Please select tasks first")
+            return
+
+        due = Querybox.get_date(parent=self.master, title="Reschedule")
+        if due is None:
+            return
+
+        self.core.edit_many(
+            [(task, {"due_date": due.isoformat()}) for task in tasks],
+            label=f"Reschedule {len(tasks)} tasks",
+        )
+        for task in tasks:
+            self.reminders.schedule(task)
+        self.show_bulk_change()
+
+    def show_bulk_change(self):
+        """Redraw once after a batched mutation"""
+        self.task_view.deselect_all()
+        self.task_view.refresh()
+
+    def undo(self):
+        """Revert the latest task change"""
+        change = self.core.undo()
+        if change is not None:
+            self.show_history_change(change)
+
+    def redo(self):
+        """Reapply the latest undone task change"""
+        change = self.core.redo()
+        if change is not None:
+            self.show_history_change(change)
+
+    def show_history_change(self, change):
+        """Bring reminders and the view in line after an undo or redo"""
+        task_ids = change.task_ids()
+        present = set()
+        for task in self.store.get_many(task_ids):
+            present.add(task.id)
+            self.reminders.schedule(task)
+        for task_id in task_ids:
+            if task_id not in present:
+                self.reminders.cancel(task_id)
+        self.task_view.refresh()
+
+    def show_reminder(self, tasks: List[Task]):
+        """Desktop notification for tasks that just became due; runs on the
+        reminder scheduler's worker thread"""
+        if len(tasks) == 1:
+            title, message = "Task Due", tasks[0].title
+        else:
+            title = f"{len(tasks)} Tasks Due"
+            message = "\n".join(task.title for task in tasks[:5])
+
+        notification.notify(title=title, message=message, app_icon=None, timeout=10)
+
+    def on_destroy(self, event):
+        self.reminders.stop()
+        self.core.close()
+
+    def archive_old_tasks(self):
+        """Move long-completed tasks out of the working set"""
+        try:
+            self.core.archive_completed(
+                self.archive, older_than=timedelta(days=ARCHIVE_AFTER_DAYS)
+            )
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not archive old tasks: {e}")
+
+    def show_history(self):
+        """Show archived tasks; the archive is only read here"""
+        try:
+            tasks = self.archive.load()
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not read the task archive: {e}")
+            return
+
+        dialog = ttk.Toplevel(self.master)
+        dialog.title(f"Task History ({len(tasks)} archived)")
+        dialog.geometry("700x400")
+
+        columns = ("id", "title", "priority", "due_date", "status")
+        history_view = VirtualTreeview(
+            dialog,
+            row_key=lambda task: task.id,
+            render_row=lambda task: (
+                (
+                    task.id,
+                    task.title,
+                    task.priority,
+                    self.format_due_date(task),
+                    (task.completed_at or "")[:10],
+                ),
+                ["completed"],
+            ),
+            columns=columns,
+            show="headings",
+            style="Task.Treeview",
+            height=15,
+        )
+        history_view.tree.heading("title", text="Task")
+        history_view.tree.heading("priority", text="Priority")
+        history_view.tree.heading("due_date", text="Due Date")
+        history_view.tree.heading("status", text="Completed")
+        history_view.tree.column("id", width=0, stretch=NO)
+        history_view.tree.column("title", width=300)
+        for column in ("priority", "due_date", "status"):
+            history_view.tree.column(column, width=120, anchor=CENTER)
+        history_view.pack(fill=BOTH, expand=YES, padx=10, pady=10)
+
+        history_view.set_source(
+            count=lambda: len(tasks),
+            fetch=lambda offset, limit: tasks[offset : offset + limit],
+        )
 
     def show_statistics(self):
         """Show task statistics"""
-        total = len(self.tasks)
-        completed = len([t for t in self.tasks if t.status == "Completed"])
-        pending = total - completed
-
-        high_priority = len([t for t in self.tasks if t.priority == "High"])
-        overdue = len(
-            [
-                t
-                for t in self.tasks
-                if t.due_date
-                and datetime.fromisoformat(t.due_date) < datetime.now()
-                and t.status != "Completed"
-            ]
+        stats = self.statistics
+
+        summary = f"""Task Statistics:
+        Total Tasks: {stats.total}
+        Completed: {stats.completed}
+        Pending: {stats.pending}
+        High Priority: {stats.by_priority["High"]}
+        Overdue: {stats.overdue()}
+        
+        Completion Rate: {stats.completion_rate:.1f}%
+        """
+
+        messagebox.showinfo("Statistics", summary)
+
+    def import_tasks(self):
+        """Bulk import tasks from a CSV or JSON-lines file"""
+        path = filedialog.askopenfilename(
+            title="Import Tasks",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("All", "*.*")],
         )
+        if not path:
+            return
 
-        stats = f"""Task Statistics:
-        Total Tasks: {total}
-        Completed: {completed}
-        Pending: {pending}
-        High Priority: {high_priority}
-        Overdue: {overdue}
-        
-        Completion Rate: {(completed/total*100 if total else 0):.1f}%
+        # Imported through the core so statistics are kept as batches land;
+        # batches are sized to about one frame so the window stays smooth
+        importer = TaskImporter(self.core, path, time_slice=0.016)
+
+        def on_batch(inserted):
+            for task in inserted:
+                self.reminders.schedule(task)
+
+        def on_done():
+            self.task_view.refresh()
+            summary = f"Imported {importer.imported} tasks."
+            if importer.skipped:
+                summary += f"\nSkipped {importer.skipped} tasks that already exist."
+            if importer.error_count:
+                summary += f"\nRejected {importer.error_count} invalid records:\n"
+                summary += "\n".join(importer.errors[:10])
+            messagebox.showinfo("Import Complete", summary)
+
+        self.run_transfer(
+            "Importing Tasks",
+            importer.run(),
+            on_batch=on_batch,
+            on_done=on_done,
+        )
+
+    def export_tasks(self):
+        """Bulk export all tasks to a CSV or JSON-lines file"""
+        path = filedialog.asksaveasfilename(
+            title="Export Tasks",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")],
+        )
+        if not path:
+            return
+
+        exporter = TaskExporter(self.store, path)
+        self.run_transfer(
+            "Exporting Tasks",
+            exporter.run(),
+            on_batch=lambda written: None,
+            on_done=lambda: messagebox.showinfo(
+                "Export Complete", f"Exported {exporter.exported} tasks to {path}"
+            ),
+        )
+
+    def run_transfer(self, title, batches, on_batch, on_done):
+        """Drive a batch generator from the Tk event loop with a progress bar.
+
+        One batch is processed per idle callback, so the window keeps
+        redrawing and responding while large files are transferred.
         """
+        dialog = ttk.Toplevel(self.master)
+        dialog.title(title)
+        dialog.geometry("360x120")
+        dialog.transient(self.master)
+
+        status_var = ttk.StringVar(value="Starting...")
+        ttk.Label(dialog, textvariable=status_var).pack(padx=20, pady=(20, 5))
+        progress = ttk.Progressbar(dialog, maximum=1.0, bootstyle="success-striped")
+        progress.pack(fill=X, padx=20, pady=5)
+
+        def step():
+            try:
+                result, fraction = next(batches)
+            except StopIteration:
+                dialog.destroy()
+                on_done()
+                return
+            except (OSError, ValueError, TypeError, csv.Error, sqlite3.Error) as e:
+                dialog.destroy()
+                messagebox.showerror(title, f"Transfer failed: {e}")
+                self.task_view.refresh()
+                return
 
-        messagebox.showinfo("Statistics", stats)
+            on_batch(result)
+            progress.configure(value=fraction)
+            status_var.set(f"{fraction * 100:.0f}% done")
+            self.master.after(1, step)
 
-    def update_view(self):
-        """Update the task tree view with filtered tasks"""
-        self.tree.delete(*self.tree.get_children())
+        self.master.after(1, step)
 
+    def update_view(self):
+        """Point the task tree at the currently filtered tasks"""
         status_filter = self.status_var.get()
         priority_filter = self.priority_var.get()
+        status = None if status_filter == "All" else status_filter
+        priority = None if priority_filter == "All" else priority_filter
+        search = self.search_var.get().strip() or None
+        project_filter = self.project_var.get()
+        project = None if project_filter == "All" else project_filter
+
+        self.query = query = self.core.query(
+            status,
+            priority,
+            search,
+            sort=self.sort_column,
+            descending=self.sort_descending,
+            tags=self.tags_var.get(),
+            project=project,
+        )
+        self.task_view.set_source(
+            count=query.count, fetch=query.fetch, matches=query.matches
+        )
 
-        for task in self.tasks:
-            if (status_filter == "All" or task.status == status_filter) and (
-                priority_filter == "All" or task.priority == priority_filter
-            ):
-
-                values = (
-                    task.id,
-                    task.title,
-                    task.priority,
-                    task.due_date or "No due date",
-                    task.status,
-                )
+    def sort_by(self, column: str):
+        """Sort by a column, toggling the direction on repeated clicks"""
+        if column == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column, self.sort_descending = column, False
+
+        for name, text in self.column_titles.items():
+            if name == self.sort_column:
+                text += " ▼" if self.sort_descending else " ▲"
+            self.tree.heading(name, text=text)
+        self.update_view()
 
-                tags = []
-                tags.append(task.priority.lower())
-                if task.status == "Completed":
-                    tags = ["completed"]
+    def show_changed_task(self, task: Task):
+        """Show an edited task; in a sorted view it may have moved"""
+        if self.sort_column:
+            self.task_view.refresh()
+        else:
+            self.task_view.update(task)
+
+    def render_task_row(self, task: Task):
+        """Treeview values and tags for a task"""
+        blocked = task.status != "Completed" and self.core.graph.is_blocked(task.id)
+        values = (
+            task.id,
+            task.title,
+            task.priority,
+            self.format_due_date(task),
+            f"{task.status} (blocked)" if blocked else task.status,
+            self.format_tracked_time(task),
+        )
 
-                self.tree.insert("", END, values=values, tags=tags)
+        tags = []
+        tags.append(task.priority.lower())
+        if task.status == "Completed":
+            tags = ["completed"]
+        elif blocked:
+            tags = ["blocked"]
+
+        return values, tags
+
+    @staticmethod
+    def format_due_date(task: Task) -> str:
+        """Due date column text, noting the repeat rule of a series"""
+        if not task.due_date:
+            return "No due date"
+        if task.rule is not None:
+            return f"{task.due_date} ({task.rule.describe()})"
+        return task.due_date
+
+    @staticmethod
+    def format_tracked_time(task: Task) -> str:
+        """Tracked column text, from the running total stored on the task"""
+        minutes = int(task.tracked_seconds // 60)
+        if not minutes:
+            return "<1m" if task.tracked_seconds else "—"
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
 
     def load_tasks(self):
-        """Load tasks from JSON file"""
+        """Import enhanced_tasks.json into the task database on first run"""
         try:
-            with open("enhanced_tasks.json", "r") as f:
-                data = json.load(f)
-                self.tasks = [Task.from_dict(task_data) for task_data in data]
-        except FileNotFoundError:
-            self.tasks = []
+            self.store.migrate_from_json("enhanced_tasks.json")
         except json.JSONDecodeError:
             messagebox.showerror(
-                "Error", "Task file is corrupted. Starting with empty task list."
+                "Error", "Task file is corrupted. Skipping import of old tasks."
             )
-            self.tasks = []
-
-    def save_tasks(self):
-        """Save tasks to JSON file"""
-        with open("enhanced_tasks.json", "w") as f:
-            json.dump([task.to_dict() for task in self.tasks], f, indent=2)
 
 
 if __name__ == "__main__":
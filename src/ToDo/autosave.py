@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+
+class AutosaveWorker:
+    """Runs a save callback on a background thread, coalescing bursts.
+
+    Callers only ``mark_dirty()``; the worker waits until no change has
+    arrived for ``delay`` seconds (or ``max_delay`` seconds have passed
+    since the first unsaved change) and then calls ``save`` once for the
+    whole burst. ``flush()`` saves synchronously, e.g. on window close.
+    """
+
+    def __init__(
+        self,
+        save: Callable[[], None],
+        delay: float = 0.5,
+        max_delay: float = 2.0,
+        name: str = "AutosaveWorker",
+    ):
+        self.save = save
+        self.delay = delay
+        self.max_delay = max_delay
+        self.logger = logging.getLogger(name)
+
+        self._condition = threading.Condition()
+        self._first_change: Optional[float] = None
+        self._last_change: Optional[float] = None
+        self._saving = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def dirty(self) -> bool:
+        return self._first_change is not None
+
+    def mark_dirty(self):
+        """Note that there are unsaved changes"""
+        with self._condition:
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._condition.notify()
+
+    def flush(self):
+        """Save pending changes now, on the calling thread"""
+        with self._condition:
+            # Wait out a save the worker already started
+            while self._saving:
+                self._condition.wait()
+            if not self.dirty:
+                return
+            self._first_change = self._last_change = None
+        self._save()
+
+    def stop(self):
+        """Flush pending changes and stop the worker thread"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped and not self._due():
+                    self._condition.wait(self._wait_time())
+                if self._stopped:
+                    return
+                self._first_change = self._last_change = None
+                self._saving = True
+            try:
+                self._save()
+            finally:
+                with self._condition:
+                    self._saving = False
+                    self._condition.notify_all()
+
+    def _due(self) -> bool:
+        if self._first_change is None:
+            return False
+        now = time.monotonic()
+        return (
+            now - self._last_change >= self.delay
+            or now - self._first_change >= self.max_delay
+        )
+
+    def _wait_time(self) -> Optional[float]:
+        if self._first_change is None:
+            return None
+        return max(
+            0.0,
+            min(
+                self._last_change + self.delay,
+                self._first_change + self.max_delay,
+            )
+            - time.monotonic(),
+        )
+
+    def _save(self):
+        try:
+            self.save()
+        except Exception as e:
+            self.logger.error(f"Error saving changes: {e}")
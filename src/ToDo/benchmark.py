@@ -0,0 +1,168 @@
+"""Benchmarks for the headless ToDo core.
+
+Generates synthetic task sets and reports load, filter, mutate and save
+latencies for both storage backends. Run from the src directory:
+
+    python -m ToDo.benchmark
+    python -m ToDo.benchmark --sizes 1000 100000 --backends sqlite
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from ToDo.todo_core import PRIORITIES, STATUSES, Task, TaskRepository, TodoCore
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+BACKENDS = ("json", "sqlite")
+WORDS = (
+    "report review draft budget client meeting invoice deploy refactor "
+    "design email call plan research update fix test release backlog"
+).split()
+TAGS = "urgent home work errand call idea bug later waiting review".split()
+PROJECTS = (None, "Work", "Work/Website", "Work/Website/Blog", "Work/Ops", "Home")
+
+
+def synthetic_tasks(count: int, seed: int = 0) -> List[Dict]:
+    """Deterministic task records with a realistic mix of fields"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    records = []
+    for i in range(count):
+        created = start + timedelta(minutes=rng.randrange(500_000))
+        status = STATUSES[rng.random() < 0.4]
+        due = created + timedelta(days=rng.randrange(-10, 60))
+        records.append(
+            {
+                "id": f"task-{i:08d}",
+                "title": " ".join(rng.sample(WORDS, 3)),
+                "description": " ".join(rng.choices(WORDS, k=8)),
+                "due_date": due.date().isoformat() if rng.random() < 0.7 else None,
+                "priority": rng.choice(PRIORITIES),
+                "tags": ",".join(rng.sample(TAGS, rng.randrange(3))) or None,
+                "project": rng.choice(PROJECTS),
+                "status": status,
+                "created_at": created.isoformat(),
+                "completed_at": (
+                    (created + timedelta(hours=5)).isoformat()
+                    if status == "Completed"
+                    else None
+                ),
+            }
+        )
+    return records
+
+
+def timed(func: Callable, repeat: int = 1) -> float:
+    """Mean wall time of func in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def write_dataset(backend: str, records: List[Dict], directory: Path) -> Path:
+    if backend == "json":
+        path = directory / "tasks.json"
+        with open(path, "w") as f:
+            json.dump(records, f)
+    else:
+        path = directory / "tasks.db"
+        repository = TaskRepository(path)
+        repository.add_many([Task.from_dict(data) for data in records])
+        repository.close()
+    return path
+
+
+def open_core(backend: str, path: Path) -> TodoCore:
+    if backend == "json":
+        # Keep the benchmark's mutations from triggering compactions
+        return TodoCore.open_json(path, compact_threshold=10**9)
+    return TodoCore.open_database(path, autosave_delay=60.0)
+
+
+def run(backend: str, size: int, mutations: int = 1000) -> Dict[str, float]:
+    """Latencies in milliseconds for one backend and task set size"""
+    results = {}
+    records = synthetic_tasks(size)
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_dataset(backend, records, Path(directory))
+        del records
+
+        core = None
+
+        def load():
+            nonlocal core
+            core = open_core(backend, path)
+
+        results["load"] = timed(load)
+
+        results["filter status+priority"] = timed(
+            lambda: core.query("Pending", "High").fetch(0, 50), repeat=20
+        )
+        results["filter deep page"] = timed(
+            lambda: core.query("Pending").fetch(size // 2, 50), repeat=20
+        )
+        results["sorted page"] = timed(
+            lambda: core.query(sort="due_date", descending=True).fetch(size // 2, 50),
+            repeat=20,
+        )
+        results["filter project+tags"] = timed(
+            lambda: core.query("Pending", tags=["urgent"], project="Work").fetch(0, 50),
+            repeat=20,
+        )
+        results["count project+tags"] = timed(
+            lambda: core.query("Pending", tags=["urgent"], project="Work").count(),
+            repeat=20,
+        )
+        results["count"] = timed(
+            lambda: core.query("Pending", "Low").count(), repeat=20
+        )
+        results["search"] = timed(
+            lambda: core.query(search="budget rev").fetch(0, 50), repeat=5
+        )
+        results["statistics"] = timed(
+            lambda: core.statistics.overdue(datetime(2025, 6, 1)), repeat=20
+        )
+
+        rng = random.Random(1)
+        targets = [
+            core.get(f"task-{rng.randrange(size):08d}")
+            for _ in range(min(mutations, size))
+        ]
+
+        def mutate():
+            for i, task in enumerate(targets):
+                if i % 2:
+                    core.complete(task)
+                else:
+                    core.edit(task, priority=rng.choice(PRIORITIES))
+
+        results["mutate (per op)"] = timed(mutate) / len(targets)
+        results["save"] = timed(core.save)
+        core.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--mutations", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    for backend in args.backends:
+        for size in args.sizes:
+            results = run(backend, size, args.mutations)
+            print(f"\n{backend} backend, {size:,} tasks")
+            for name, ms in results.items():
+                print(f"  {name:<24}{ms:>12.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
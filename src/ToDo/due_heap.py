@@ -0,0 +1,62 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class DueHeap:
+    """Min-heap of (due_ts, task id) with lazy deletion.
+
+    Each task has at most one live deadline, kept in ``_due``. Changing or
+    removing it only updates that mapping; the old heap entry becomes stale
+    and is dropped when it reaches the top, or when stale entries make up
+    most of the heap and it is rebuilt.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[int, str]] = []  # (due_ts, task id)
+        self._due: Dict[str, int] = {}  # task id -> due_ts
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def get(self, task_id: str) -> Optional[int]:
+        return self._due.get(task_id)
+
+    def load(self, deadlines: Iterable[Tuple[str, int]]):
+        """Add (task id, due_ts) pairs in bulk, with one heapify"""
+        for task_id, due_ts in deadlines:
+            self._due[task_id] = due_ts
+            self._heap.append((due_ts, task_id))
+        heapq.heapify(self._heap)
+
+    def push(self, task_id: str, due_ts: int):
+        """Set the deadline of a task, replacing any earlier one"""
+        self._due[task_id] = due_ts
+        heapq.heappush(self._heap, (due_ts, task_id))
+        self._compact()
+
+    def discard(self, task_id: str) -> bool:
+        """Forget the deadline of a task; returns whether it had one"""
+        return self._due.pop(task_id, None) is not None
+
+    def peek(self) -> Optional[Tuple[int, str]]:
+        """Earliest live (due_ts, task id), dropping stale entries"""
+        while self._heap:
+            due_ts, task_id = self._heap[0]
+            if self._due.get(task_id) == due_ts:
+                return due_ts, task_id
+            heapq.heappop(self._heap)
+        return None
+
+    def pop(self) -> Optional[Tuple[int, str]]:
+        """Remove and return the earliest live (due_ts, task id)"""
+        entry = self.peek()
+        if entry is not None:
+            heapq.heappop(self._heap)
+            del self._due[entry[1]]
+        return entry
+
+    def _compact(self):
+        # Drop stale entries once they make up most of the heap
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(due_ts, task_id) for task_id, due_ts in self._due.items()]
+            heapq.heapify(self._heap)
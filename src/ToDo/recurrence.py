@@ -0,0 +1,128 @@
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+from ToDo.task import _DAY_US, _EPOCH, format_due, parse_timestamp, to_timestamp
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+_STEP_DAYS = {"daily": 1, "weekly": 7}
+
+
+class Recurrence:
+    """A repeat rule anchored at the first occurrence.
+
+    Occurrence ``n`` is computed directly from the anchor (``start``) as
+    ``start + n * interval`` days, weeks or months, so a series is stored
+    as one rule however long it runs and any window of it can be expanded
+    without walking the occurrences before it. Monthly dates that do not
+    exist (the 31st in April) fall on the last day of that month.
+
+    Rules serialize to an RRULE-like string such as
+    ``FREQ=WEEKLY;INTERVAL=2;DTSTART=2024-05-06;UNTIL=2024-12-31``.
+    """
+
+    __slots__ = ("frequency", "interval", "start", "until")
+
+    def __init__(
+        self,
+        frequency: str,
+        start: int,
+        interval: int = 1,
+        until: Optional[int] = None,
+    ):
+        frequency = frequency.lower()
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"unknown frequency {frequency!r}")
+        if start is None:
+            raise ValueError("a recurrence needs a start date")
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+        self.frequency = frequency
+        self.interval = interval
+        self.start = start
+        self.until = until
+
+    @classmethod
+    def parse(cls, text: str) -> "Recurrence":
+        """Parse a rule string; raises ValueError if it is malformed"""
+        try:
+            parts = dict(part.split("=", 1) for part in text.split(";"))
+            return cls(
+                parts["FREQ"],
+                start=parse_timestamp(parts["DTSTART"]),
+                interval=int(parts.get("INTERVAL", 1)),
+                until=parse_timestamp(parts.get("UNTIL")),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"invalid recurrence rule {text!r}") from e
+
+    def __str__(self) -> str:
+        text = (
+            f"FREQ={self.frequency.upper()};INTERVAL={self.interval};"
+            f"DTSTART={format_due(self.start)}"
+        )
+        if self.until is not None:
+            text += f";UNTIL={format_due(self.until)}"
+        return text
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Recurrence) and str(self) == str(other)
+
+    def describe(self) -> str:
+        """Short human readable form, e.g. 'every 2 weeks'"""
+        unit = {"daily": "day", "weekly": "week", "monthly": "month"}[self.frequency]
+        if self.interval == 1:
+            return self.frequency
+        return f"every {self.interval} {unit}s"
+
+    def nth(self, n: int) -> int:
+        """Timestamp of occurrence n (0 is the anchor)"""
+        if self.frequency == "monthly":
+            return _add_months(self.start, n * self.interval)
+        return self.start + n * self.interval * _STEP_DAYS[self.frequency] * _DAY_US
+
+    def occurrences(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> Iterator[int]:
+        """Lazily yield occurrence timestamps with start <= ts < end"""
+        n = self._index_at(start) if start is not None else 0
+        while True:
+            ts = self.nth(n)
+            if (end is not None and ts >= end) or (
+                self.until is not None and ts > self.until
+            ):
+                return
+            yield ts
+            n += 1
+
+    def next_after(self, timestamp: int) -> Optional[int]:
+        """First occurrence strictly after timestamp, or None if the series ended"""
+        return next(self.occurrences(timestamp + 1), None)
+
+    def _index_at(self, timestamp: int) -> int:
+        """Smallest n with nth(n) >= timestamp, found without iterating"""
+        if timestamp <= self.start:
+            return 0
+        if self.frequency == "monthly":
+            first, target = _to_date(self.start), _to_date(timestamp)
+            months = (target.year - first.year) * 12 + target.month - first.month
+            n = max(0, months // self.interval - 1)
+        else:
+            step = self.interval * _STEP_DAYS[self.frequency] * _DAY_US
+            n = (timestamp - self.start) // step
+        while self.nth(n) < timestamp:
+            n += 1
+        return n
+
+
+def _to_date(timestamp: int) -> date:
+    return (_EPOCH + timedelta(microseconds=timestamp)).date()
+
+
+def _add_months(timestamp: int, months: int) -> int:
+    value = _EPOCH + timedelta(microseconds=timestamp)
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    # Clamp to the last day of a shorter month
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    day = min(value.day, (next_month - timedelta(days=1)).day)
+    return to_timestamp(value.replace(year=year, month=month, day=day))
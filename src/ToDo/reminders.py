@@ -0,0 +1,104 @@
+import threading
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from ToDo.due_heap import DueHeap
+from ToDo.task import to_timestamp
+
+# Wake up at least this often so clock changes and suspends are noticed
+MAX_TIMER_MS = 60 * 60 * 1000
+
+
+class ReminderScheduler:
+    """Fires a reminder when a task's due date arrives.
+
+    Upcoming due dates sit in a DueHeap and exactly one Tk ``after`` timer
+    is armed, for the earliest of them. Scheduling or cancelling a task is
+    O(log n) and only re-arms the timer when the earliest deadline changed.
+
+    When the timer fires, the due tasks are looked up on the Tk thread and
+    ``notify(tasks)`` is called on a background thread, so a slow desktop
+    notification never blocks the UI.
+    """
+
+    def __init__(
+        self,
+        master,
+        lookup: Callable[[str], Optional[object]],
+        notify: Callable[[List], None],
+    ):
+        self.master = master
+        self.lookup = lookup
+        self.notify = notify
+        self._deadlines = DueHeap()
+        self._timer: Optional[str] = None
+        self._timer_ts: Optional[int] = None
+
+    def load(
+        self, deadlines: Iterable[Tuple[str, int]], now: Optional[datetime] = None
+    ):
+        """Schedule (task id, due_ts) pairs, e.g. store.pending_deadlines()"""
+        now_ts = to_timestamp(now or datetime.now())
+        self._deadlines.load(
+            (task_id, due_ts) for task_id, due_ts in deadlines if due_ts > now_ts
+        )
+        self._arm()
+
+    def schedule(self, task):
+        """Track the current due date of a task that was added or changed"""
+        due_ts = task.due_ts
+        if (
+            task.status == "Completed"
+            or due_ts is None
+            or due_ts <= to_timestamp(datetime.now())
+        ):
+            self.cancel(task.id)
+            return
+        if self._deadlines.get(task.id) == due_ts:
+            return
+
+        self._deadlines.push(task.id, due_ts)
+        self._arm()
+
+    def cancel(self, task_id: str):
+        """Forget the reminder of a task that was deleted or completed"""
+        if self._deadlines.discard(task_id):
+            self._arm()
+
+    def stop(self):
+        """Cancel the pending timer"""
+        if self._timer is not None:
+            self.master.after_cancel(self._timer)
+            self._timer = self._timer_ts = None
+
+    def _arm(self):
+        entry = self._deadlines.peek()
+        due_ts = None if entry is None else entry[0]
+        if due_ts == self._timer_ts:
+            return
+
+        self.stop()
+        if due_ts is None:
+            return
+        delay_ms = (due_ts - to_timestamp(datetime.now())) // 1000
+        self._timer_ts = due_ts
+        self._timer = self.master.after(
+            max(0, min(delay_ms, MAX_TIMER_MS)), self._on_timer
+        )
+
+    def _on_timer(self):
+        self._timer = self._timer_ts = None
+        now_ts = to_timestamp(datetime.now())
+
+        due_ids = []
+        while True:
+            entry = self._deadlines.peek()
+            if entry is None or entry[0] > now_ts:
+                break
+            self._deadlines.pop()
+            due_ids.append(entry[1])
+
+        tasks = [task for task in map(self.lookup, due_ids) if task is not None]
+        if tasks:
+            threading.Thread(target=self.notify, args=(tasks,), daemon=True).start()
+        self._arm()
@@ -0,0 +1,283 @@
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional
+import re
+import sys
+import uuid
+
+# Timestamps are stored as integer microseconds since this (naive, local)
+# epoch. Treating the naive ISO strings as wall-clock values keeps the
+# round trip exact and unaffected by DST transitions.
+_EPOCH = datetime(1970, 1, 1)
+_DAY_US = 86_400_000_000
+
+PRIORITIES = ("High", "Medium", "Low")
+STATUSES = ("Pending", "Completed")
+
+
+def parse_timestamp(text: Optional[str]) -> Optional[int]:
+    """Parse an ISO date or datetime string to epoch microseconds.
+
+    Returns None for empty values; raises ValueError for malformed ones.
+    """
+    if not text:
+        return None
+    return to_timestamp(datetime.fromisoformat(text))
+
+
+def to_timestamp(value: datetime) -> int:
+    """Epoch microseconds for a datetime"""
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def format_timestamp(
+    timestamp: Optional[int], date_only: bool = False
+) -> Optional[str]:
+    """Format epoch microseconds back to an ISO string"""
+    if timestamp is None:
+        return None
+    value = _EPOCH + timedelta(microseconds=timestamp)
+    return value.date().isoformat() if date_only else value.isoformat()
+
+
+def format_due(timestamp: Optional[int]) -> Optional[str]:
+    """Format a due timestamp, as a plain date when it falls on midnight"""
+    if timestamp is None:
+        return None
+    return format_timestamp(timestamp, date_only=timestamp % _DAY_US == 0)
+
+
+def search_terms(text: str) -> List[str]:
+    """Lower-cased word tokens of a search query"""
+    return re.findall(r"\w+", text.lower())
+
+
+def parse_tags(text) -> FrozenSet[str]:
+    """Lower-cased tags from comma separated text or an iterable of tags.
+
+    Commas, quotes and control characters are stripped from the tags
+    themselves, since the database stores a task's tags as one comma
+    separated string.
+    """
+    if isinstance(text, str):
+        text = text.split(",")
+    tags = (
+        re.sub(r'[,"\\\x00-\x1f\x7f]', "", tag).strip().lstrip("#").lower()
+        for tag in text or ()
+    )
+    return frozenset(tag for tag in tags if tag)
+
+
+def normalize_project(path: Optional[str]) -> Optional[str]:
+    """Project path with blank levels dropped, e.g. 'Work / Site' -> 'Work/Site'"""
+    parts = [part.strip() for part in (path or "").split("/")]
+    return "/".join(part for part in parts if part) or None
+
+
+def project_ancestors(project: Optional[str]) -> List[str]:
+    """The project and every project above it, outermost first"""
+    if not project:
+        return []
+    parts = project.split("/")
+    return ["/".join(parts[: i + 1]) for i in range(len(parts))]
+
+
+def matches_search(task: "Task", terms: List[str]) -> bool:
+    """Whether every term is a prefix of a word in the task's title or
+    description; mirrors the full-text query for single-task checks"""
+    words = search_terms(f"{task.title} {task.description}")
+    return all(any(word.startswith(term) for word in words) for term in terms)
+
+
+class Task:
+    """A single to-do item.
+
+    Slotted to keep per-task memory small on large histories. Priority and
+    status strings are interned, and dates are kept as integer epoch
+    microseconds (``due_ts``, ``created_ts``, ``completed_ts``) so sorting
+    and comparing them never reparses a string. The ISO string attributes
+    (``due_date``, ``created_at``, ``completed_at``) are views over them.
+
+    A repeating task is one row carrying a Recurrence ``rule``; its due
+    date is the next pending occurrence of the series. ``depends_on`` holds
+    the ids of the tasks it is blocked by. ``tag_set`` holds its tags and
+    ``project`` a slash separated path such as ``Work/Client/Site``; a
+    task belongs to every project above its own as well.
+    ``tracked_seconds`` is the stopwatch time logged against the task,
+    kept as a running total.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "description",
+        "_priority",
+        "_status",
+        "due_ts",
+        "created_ts",
+        "completed_ts",
+        "_due_text",
+        "rule",
+        "depends_on",
+        "tag_set",
+        "_project",
+        "tracked_seconds",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        description: str = "",
+        due_date: Optional[str] = None,
+        priority: str = "Medium",
+        status: str = "Pending",
+        recurrence: Optional[str] = None,
+        dependencies: Optional[str] = None,
+        tags: Optional[str] = None,
+        project: Optional[str] = None,
+    ):
+
+        self.id = str(uuid.uuid4())
+        self.title = title
+        self.description = description
+        self.due_date = due_date
+        self.priority = priority
+        self.status = status
+        self.recurrence = recurrence
+        self.dependencies = dependencies
+        self.tags = tags
+        self.project = project
+        self.tracked_seconds = 0.0
+        self.created_ts = to_timestamp(datetime.now())
+        self.completed_ts: Optional[int] = None
+
+    @property
+    def priority(self) -> str:
+        return self._priority
+
+    @priority.setter
+    def priority(self, value: Optional[str]):
+        # NULL priorities occur in rows from older databases
+        self._priority = sys.intern(value or "Medium")
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: Optional[str]):
+        self._status = sys.intern(value or "Pending")
+
+    @property
+    def due_date(self) -> Optional[str]:
+        if self.due_ts is None:
+            # Keep unparseable legacy values so they survive a round trip
+            return self._due_text
+        return format_due(self.due_ts)
+
+    @due_date.setter
+    def due_date(self, value: Optional[str]):
+        try:
+            self.due_ts = parse_timestamp(value)
+            self._due_text = None
+        except ValueError:
+            self.due_ts = None
+            self._due_text = value
+
+    @property
+    def created_at(self) -> str:
+        return format_timestamp(self.created_ts)
+
+    @created_at.setter
+    def created_at(self, value: str):
+        self.created_ts = parse_timestamp(value)
+
+    @property
+    def completed_at(self) -> Optional[str]:
+        return format_timestamp(self.completed_ts)
+
+    @completed_at.setter
+    def completed_at(self, value: Optional[str]):
+        self.completed_ts = parse_timestamp(value)
+
+    @property
+    def recurrence(self) -> Optional[str]:
+        """Repeat rule as a string; ``rule`` holds the parsed Recurrence"""
+        return None if self.rule is None else str(self.rule)
+
+    @recurrence.setter
+    def recurrence(self, value: Optional[str]):
+        if not value:
+            self.rule = None
+            return
+        # Imported here: recurrence builds on this module's date helpers
+        from ToDo.recurrence import Recurrence
+
+        self.rule = value if isinstance(value, Recurrence) else Recurrence.parse(value)
+
+    @property
+    def dependencies(self) -> Optional[str]:
+        """Comma separated ids of ``depends_on``, as stored"""
+        return ",".join(self.depends_on) or None
+
+    @dependencies.setter
+    def dependencies(self, value):
+        if isinstance(value, str):
+            value = value.split(",")
+        self.depends_on = tuple(
+            dict.fromkeys(task_id.strip() for task_id in value or () if task_id.strip())
+        )
+
+    @property
+    def tags(self) -> Optional[str]:
+        """Comma separated ``tag_set``, as stored"""
+        return ",".join(sorted(self.tag_set)) or None
+
+    @tags.setter
+    def tags(self, value):
+        self.tag_set = parse_tags(value)
+
+    @property
+    def project(self) -> Optional[str]:
+        return self._project
+
+    @project.setter
+    def project(self, value: Optional[str]):
+        self._project = normalize_project(value)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "due_date": self.due_date,
+            "priority": self.priority,
+            "status": self.status,
+            "created_at": self.created_at,
+            "completed_at": self.completed_at,
+            "recurrence": self.recurrence,
+            "dependencies": self.dependencies,
+            "tags": self.tags,
+            "project": self.project,
+            "tracked_seconds": self.tracked_seconds,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Task":
+        # Skip __init__: no uuid or clock call for tasks being loaded
+        task = cls.__new__(cls)
+        task.id = data["id"]
+        task.title = data["title"]
+        task.description = data["description"]
+        task.due_date = data["due_date"]
+        task.priority = data["priority"]
+        task.status = data["status"]
+        task.created_at = data["created_at"]
+        task.completed_at = data["completed_at"]
+        task.recurrence = data.get("recurrence")
+        task.dependencies = data.get("dependencies")
+        task.tags = data.get("tags")
+        task.project = data.get("project")
+        task.tracked_seconds = float(data.get("tracked_seconds") or 0.0)
+        return task
@@ -0,0 +1,60 @@
+import gzip
+import json
+import logging
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from ToDo.task import Task
+
+
+class TaskArchive:
+    """Compressed, append-only store for old completed tasks.
+
+    Each archiving run appends one gzip member of JSON lines to the file,
+    so writing never rewrites what is already archived and nothing is read
+    until history is asked for. Readers stream the concatenated members.
+
+    Tasks are archived before they are deleted from the working store; a
+    crash in between leaves a task in both, and ``load()`` keeps the last
+    copy of each id.
+    """
+
+    def __init__(self, path="mindflow_archive.jsonl.gz"):
+        self.path = Path(path)
+        self.logger = logging.getLogger("TaskArchive")
+
+    def append(self, tasks: Iterable[Task]) -> int:
+        """Append tasks to the archive, returning how many were written"""
+        lines = [json.dumps(task.to_dict(), separators=(",", ":")) for task in tasks]
+        if not lines:
+            return 0
+        with open(self.path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(("\n".join(lines) + "\n").encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+        return len(lines)
+
+    def records(self) -> Iterator[Dict]:
+        """Stream archived task dicts in the order they were archived"""
+        if not self.path.exists():
+            return
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        self.logger.warning(f"Skipping damaged record in {self.path}")
+        except (EOFError, OSError, zlib.error) as e:
+            # A torn last member from a crash mid-append
+            self.logger.warning(f"Archive {self.path} ends early: {e}")
+
+    def load(self) -> List[Task]:
+        """Every archived task, most recently completed first"""
+        records = {data["id"]: data for data in self.records()}
+        tasks = [Task.from_dict(data) for data in records.values()]
+        tasks.sort(key=lambda task: task.completed_ts or 0, reverse=True)
+        return tasks
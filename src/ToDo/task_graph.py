@@ -0,0 +1,206 @@
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class DependencyCycleError(ValueError):
+    """Raised when a new dependency would make a task wait on itself"""
+
+    def __init__(self, path: List[str]):
+        self.path = path
+        super().__init__(f"dependency cycle: {' -> '.join(path)}")
+
+
+class TaskGraph:
+    """Incrementally maintained "blocked by" graph over task ids.
+
+    Only tasks that have dependencies, or that other tasks depend on, are
+    tracked; any other task is ready as long as it is not completed. For
+    every tracked task the graph keeps the number of its dependencies that
+    are not completed, and a task whose count is above zero is blocked.
+    Completing a task decrements the counts of its dependents only, so it
+    costs O(out-degree) rather than a rescan, and reopening it (e.g. on
+    undo) is the exact reverse.
+
+    The ``ready`` set of every uncompleted, unblocked task is built from
+    ``pending_ids()`` the first time it is asked for, and from then on is
+    updated whenever a count reaches or leaves zero or a task changes.
+
+    The status of a task that becomes tracked later, when a dependency on
+    it is added, is read with ``lookup(task_id)``. Dependencies on ids the
+    graph does not know, such as deleted or archived tasks, count as met.
+    Cycles are refused by ``check()`` when an edge is added; dependencies
+    arriving with new tasks are taken as they are, and tasks caught in a
+    cycle there simply stay blocked.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[str], Optional[object]] = lambda task_id: None,
+        pending_ids: Callable[[], Iterable[str]] = lambda: (),
+    ):
+        self.lookup = lookup
+        self.pending_ids = pending_ids
+        self._depends_on: Dict[str, Tuple[str, ...]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._tracked: Set[str] = set()
+        self._pending: Set[str] = set()  # tracked tasks that are not completed
+        self._unmet: Dict[str, int] = {}  # task id -> pending dependencies, if any
+        self._ready: Optional[Set[str]] = None  # not built until first used
+
+    @classmethod
+    def from_store(cls, store) -> "TaskGraph":
+        """Build the graph from a TaskStore or TaskRepository"""
+        graph = cls(store.get, store.pending_ids)
+        rows = []
+        for task_id, status, dependencies in store.task_dependencies():
+            graph._tracked.add(task_id)
+            if status != "Completed":
+                graph._pending.add(task_id)
+            if dependencies:
+                rows.append((task_id, tuple(dependencies.split(","))))
+        for task_id, depends_on in rows:
+            graph._link(task_id, depends_on)
+        return graph
+
+    @property
+    def ready(self) -> Set[str]:
+        """Ids of the uncompleted tasks whose dependencies are all completed"""
+        if self._ready is None:
+            self._ready = set(self.pending_ids())
+            self._ready.difference_update(self._unmet)
+        return self._ready
+
+    def blockers(self, task_id: str) -> List[str]:
+        """Ids of the dependencies of a task that are not completed yet"""
+        return [
+            dep for dep in self._depends_on.get(task_id, ()) if dep in self._pending
+        ]
+
+    def dependents(self, task_id: str) -> Set[str]:
+        """Ids of the tasks that depend on a task"""
+        return self._dependents.get(task_id, set())
+
+    def is_blocked(self, task_id: str) -> bool:
+        return task_id in self._unmet
+
+    def check(self, task_id: str, depends_on: Iterable[str]):
+        """Raise DependencyCycleError if task_id may not depend on these ids"""
+        current = set(self._depends_on.get(task_id, ()))
+        for dep in depends_on:
+            if dep in current:
+                continue
+            path = self._path(dep, task_id)
+            if path is not None:
+                raise DependencyCycleError([task_id, *path])
+
+    def add(self, task):
+        """Track a task that was added to the store"""
+        if task.id in self._tracked and task.status != "Completed":
+            self._reopen(task.id)
+        self._link(task.id, task.depends_on, task.status)
+        self._mark(task.id, task.status != "Completed" and not self.is_blocked(task.id))
+
+    def remove(self, task):
+        """Forget a task that was deleted; its dependents no longer wait on it"""
+        self._unlink(task.id)
+        self._close(task.id)
+        self._mark(task.id, False)
+
+    def update(self, task):
+        """Apply the saved status and dependencies of an edited task"""
+        if task.depends_on != self._depends_on.get(task.id, ()):
+            self._unlink(task.id)
+            self._link(task.id, task.depends_on, task.status)
+        if task.id in self._tracked:
+            if task.status == "Completed":
+                self._close(task.id)
+            else:
+                self._reopen(task.id)
+        self._mark(task.id, task.status != "Completed" and not self.is_blocked(task.id))
+
+    def _close(self, task_id: str):
+        if task_id not in self._pending:
+            return
+        self._pending.discard(task_id)
+        for dependent in self._dependents.get(task_id, ()):
+            self._unmet[dependent] -= 1
+            if not self._unmet[dependent]:
+                del self._unmet[dependent]
+                self._mark(dependent, dependent in self._pending)
+
+    def _reopen(self, task_id: str):
+        if task_id in self._pending:
+            return
+        self._pending.add(task_id)
+        for dependent in self._dependents.get(task_id, ()):
+            self._unmet[dependent] = self._unmet.get(dependent, 0) + 1
+            self._mark(dependent, False)
+
+    def _mark(self, task_id: str, ready: bool):
+        """Add a task to or drop it from the ready set, once that is built"""
+        if self._ready is None:
+            return
+        if ready:
+            self._ready.add(task_id)
+        else:
+            self._ready.discard(task_id)
+
+    def _track(self, task_id: str, status: Optional[str] = None):
+        """Start following the status of a task, looking it up if not given"""
+        if task_id in self._tracked:
+            return
+        if status is None:
+            task = self.lookup(task_id)
+            status = "Completed" if task is None else task.status
+        self._tracked.add(task_id)
+        if status != "Completed":
+            self._pending.add(task_id)
+
+    def _untrack(self, task_id: str):
+        """Stop following a task that no longer has an edge"""
+        if task_id not in self._depends_on and task_id not in self._dependents:
+            self._tracked.discard(task_id)
+            self._pending.discard(task_id)
+
+    def _link(
+        self, task_id: str, depends_on: Tuple[str, ...], status: Optional[str] = None
+    ):
+        if not depends_on:
+            return
+        self._track(task_id, status)
+        self._depends_on[task_id] = depends_on
+        unmet = 0
+        for dep in depends_on:
+            self._track(dep)
+            self._dependents.setdefault(dep, set()).add(task_id)
+            unmet += dep in self._pending
+        if unmet:
+            self._unmet[task_id] = unmet
+
+    def _unlink(self, task_id: str):
+        for dep in self._depends_on.pop(task_id, ()):
+            dependents = self._dependents.get(dep)
+            if dependents is not None:
+                dependents.discard(task_id)
+                if not dependents:
+                    del self._dependents[dep]
+                    self._untrack(dep)
+        self._unmet.pop(task_id, None)
+        self._untrack(task_id)
+
+    def _path(self, start: str, target: str) -> Optional[List[str]]:
+        """Dependency path from start to target, found depth-first"""
+        parents: Dict[str, Optional[str]] = {start: None}
+        stack = [start]
+        while stack:
+            task_id = stack.pop()
+            if task_id == target:
+                path = []
+                while task_id is not None:
+                    path.append(task_id)
+                    task_id = parents[task_id]
+                return path[::-1]
+            for dep in self._depends_on.get(task_id, ()):
+                if dep not in parents:
+                    parents[dep] = task_id
+                    stack.append(dep)
+        return None
@@ -0,0 +1,114 @@
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class TaskChange:
+    """One undoable mutation, stored as a delta.
+
+    ``added`` and ``removed`` hold the task dicts of tasks that were
+    created or deleted; ``edited`` maps a task id to the (before, after)
+    values of only the fields that changed. A bulk operation is a single
+    TaskChange however many tasks it touched.
+    """
+
+    __slots__ = ("label", "added", "removed", "edited")
+
+    def __init__(
+        self,
+        label: str,
+        added: Optional[List[Dict]] = None,
+        removed: Optional[List[Dict]] = None,
+        edited: Optional[Dict[str, Tuple[Dict, Dict]]] = None,
+    ):
+        self.label = label
+        self.added = added or []
+        self.removed = removed or []
+        self.edited = edited or {}
+
+    @property
+    def size(self) -> int:
+        """Approximate memory cost, in stored field values"""
+        return (
+            sum(map(len, self.added))
+            + sum(map(len, self.removed))
+            + sum(len(before) + len(after) for before, after in self.edited.values())
+        )
+
+    def task_ids(self) -> List[str]:
+        """Ids of every task the change touches"""
+        return (
+            [data["id"] for data in self.added]
+            + [data["id"] for data in self.removed]
+            + list(self.edited)
+        )
+
+    def inverted(self) -> "TaskChange":
+        """The change that undoes this one"""
+        return TaskChange(
+            self.label,
+            added=self.removed,
+            removed=self.added,
+            edited={
+                task_id: (after, before)
+                for task_id, (before, after) in self.edited.items()
+            },
+        )
+
+
+class TaskHistory:
+    """Bounded undo and redo stacks of TaskChanges.
+
+    The memory budget is counted in stored field values across both
+    stacks; once it is exceeded the oldest undo entries are dropped. The
+    most recent change is always kept, however large.
+    """
+
+    def __init__(self, max_size: int = 500_000):
+        self.max_size = max_size
+        self._undo: Deque[TaskChange] = deque()
+        self._redo: List[TaskChange] = []
+        self._size = 0
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo_label(self) -> Optional[str]:
+        return self._undo[-1].label if self._undo else None
+
+    def redo_label(self) -> Optional[str]:
+        return self._redo[-1].label if self._redo else None
+
+    def record(self, change: TaskChange):
+        """Push a new change; it invalidates everything that could be redone"""
+        self._size -= sum(entry.size for entry in self._redo)
+        self._redo.clear()
+        self._undo.append(change)
+        self._size += change.size
+        while self._size > self.max_size and len(self._undo) > 1:
+            self._size -= self._undo.popleft().size
+
+    def pop_undo(self) -> Optional[TaskChange]:
+        """Move the latest change to the redo stack and return it"""
+        if not self._undo:
+            return None
+        change = self._undo.pop()
+        self._redo.append(change)
+        return change
+
+    def pop_redo(self) -> Optional[TaskChange]:
+        """Move the latest undone change back to the undo stack and return it"""
+        if not self._redo:
+            return None
+        change = self._redo.pop()
+        self._undo.append(change)
+        return change
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._size = 0
@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+class TaskJournal:
+    """Append-only persistence for tasks.
+
+    Every mutation is appended to a JSON-lines journal next to the snapshot
+    file, so a save costs the size of the change instead of the size of the
+    list. Once the journal grows past ``compact_threshold`` records it is
+    rotated and folded into a fresh snapshot on a background thread.
+
+    Crash safety:
+      * snapshots are written to a temp file and atomically renamed
+      * a torn last journal line (crash mid-append) is dropped on load
+      * journal records are full task states or deletes, so replaying a
+        rotated journal over a snapshot that already contains it is harmless
+
+    Compaction only copies the list of task objects on the caller's thread;
+    they are encoded on the background thread. A task edited in the
+    meantime may reach the snapshot half old, half new, but every such
+    edit is also in the new journal, which is replayed over the snapshot.
+    """
+
+    def __init__(
+        self,
+        snapshot_path="enhanced_tasks.json",
+        snapshot_source: Optional[Callable[[], List]] = None,
+        compact_threshold: int = 500,
+    ):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_name(
+            self.snapshot_path.stem + ".journal"
+        )
+        self.rotated_path = self.snapshot_path.with_name(
+            self.snapshot_path.stem + ".journal.compacting"
+        )
+        self.snapshot_source = snapshot_source
+        self.compact_threshold = compact_threshold
+
+        self.logger = logging.getLogger("TaskJournal")
+        self._file = None
+        self._records = 0
+        self._compactor: Optional[threading.Thread] = None
+
+    def load(self) -> List[Dict]:
+        """Replay snapshot plus journal and return the task dicts.
+
+        Raises json.JSONDecodeError if the snapshot itself is corrupted.
+        """
+        tasks: Dict[str, Dict] = {}
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "r") as f:
+                for data in json.load(f):
+                    tasks[data["id"]] = data
+
+        needs_compaction = self.rotated_path.exists()
+        self._replay(self.rotated_path, tasks)
+        self._records = self._replay(self.journal_path, tasks)
+
+        if needs_compaction:
+            # A previous compaction did not finish: fold everything into a
+            # new snapshot before new records are appended.
+            self._write_snapshot(list(tasks.values()))
+            self.rotated_path.unlink(missing_ok=True)
+            self.journal_path.unlink(missing_ok=True)
+            self._records = 0
+
+        return list(tasks.values())
+
+    def put(self, task):
+        """Record the full current state of a task"""
+        self._append({"op": "put", "task": task.to_dict()})
+
+    def delete(self, task_id: str):
+        """Record the deletion of a task"""
+        self._append({"op": "delete", "id": task_id})
+
+    def put_many(self, tasks):
+        """Record the states of a batch of tasks with a single write"""
+        self._append(*({"op": "put", "task": task.to_dict()} for task in tasks))
+
+    def delete_many(self, task_ids):
+        """Record a batch of deletions with a single write"""
+        self._append(*({"op": "delete", "id": task_id} for task_id in task_ids))
+
+    def compact(self):
+        """Rotate the journal and write a new snapshot in the background"""
+        if self.snapshot_source is None or self.compacting:
+            return
+
+        self._close_file()
+        if self.journal_path.exists():
+            if self.rotated_path.exists():
+                # An earlier compaction failed; keep its records ahead of ours
+                with open(self.rotated_path, "ab") as dst, open(
+                    self.journal_path, "rb"
+                ) as src:
+                    shutil.copyfileobj(src, dst)
+                self.journal_path.unlink()
+            else:
+                os.replace(self.journal_path, self.rotated_path)
+        self._records = 0
+
+        # Only the list of tasks is copied on the caller's thread; encoding
+        # and disk I/O happen in the background.
+        tasks = self.snapshot_source()
+        self._compactor = threading.Thread(
+            target=self._finish_compaction, args=(tasks,), daemon=True
+        )
+        self._compactor.start()
+
+    @property
+    def compacting(self) -> bool:
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def close(self):
+        """Wait for a running compaction and close the journal file"""
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        self._close_file()
+
+    def _append(self, *records: Dict):
+        if not records:
+            return
+        if self._file is None:
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+        self._file.write(
+            "".join(
+                json.dumps(record, separators=(",", ":")) + "\n" for record in records
+            )
+        )
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self._records += len(records)
+        if self._records >= self.compact_threshold:
+            self.compact()
+
+    def _replay(self, path: Path, tasks: Dict[str, Dict]) -> int:
+        """Apply journal records from path to tasks, returning the count"""
+        if not path.exists():
+            return 0
+
+        count = 0
+        good_offset = 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash: drop it and anything after
+                    self.logger.warning(f"Discarding torn record in {path}")
+                    break
+                if record["op"] == "put":
+                    tasks[record["task"]["id"]] = record["task"]
+                elif record["op"] == "delete":
+                    tasks.pop(record["id"], None)
+                good_offset += len(line)
+                count += 1
+
+        if good_offset < path.stat().st_size:
+            os.truncate(path, good_offset)
+        return count
+
+    def _finish_compaction(self, tasks: List):
+        try:
+            self._write_snapshot([task.to_dict() for task in tasks])
+            self.rotated_path.unlink(missing_ok=True)
+        except OSError as e:
+            # The rotated journal is kept and replayed on the next load
+            self.logger.error(f"Error compacting task journal: {e}")
+
+    def _write_snapshot(self, records: List[Dict]):
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(records, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,825 @@
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ToDo.autosave import AutosaveWorker
+from ToDo.task import (
+    Task,
+    normalize_project,
+    parse_tags,
+    parse_timestamp,
+    project_ancestors,
+    search_terms,
+)
+from ToDo.task_journal import TaskJournal
+
+
+class TaskRepository:
+    """SQLite-backed task store.
+
+    Exposes the same interface as TaskStore, but filters are executed as
+    indexed SQL queries and only the rows asked for are turned into Task
+    objects, so startup cost and memory do not grow with the task history.
+
+    Every row also stores its parsed due date as integer microseconds in
+    ``due_ts`` (NULL for legacy values that do not parse), so due-date
+    windows compare instants rather than text, like TaskStore does.
+
+    Titles and descriptions are indexed in an FTS5 table kept in sync by
+    triggers, which backs prefix search ranked by bm25. Tags are likewise
+    split by triggers into the task_tags table, keyed by task rowid, so a
+    tag filter is a lookup of integer keys; a project filter is a range
+    scan of the project index that also covers subprojects.
+
+    With ``autosave_delay`` set, mutations are executed in an open
+    transaction and committed by a background AutosaveWorker once writes
+    stop arriving, so a burst of changes costs one commit and the caller
+    never waits on the disk. ``close()`` commits whatever is pending.
+    """
+
+    COLUMNS = (
+        "id",
+        "title",
+        "description",
+        "due_date",
+        "priority",
+        "status",
+        "created_at",
+        "completed_at",
+        "recurrence",
+        "dependencies",
+        "tags",
+        "project",
+        "tracked_seconds",
+    )
+    # Declared types of columns that are not TEXT
+    COLUMN_TYPES = {"tracked_seconds": "REAL DEFAULT 0"}
+    # Every stored column: COLUMNS, then the due_ts derived from due_date
+    STORED_COLUMNS = COLUMNS + ("due_ts",)
+    INSERT_SQL = (
+        f"INSERT INTO tasks ({', '.join(STORED_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(STORED_COLUMNS))})"
+    )
+    SCHEMA_VERSION = 1
+    # ORDER BY terms per sortable column, each backed by an index created in
+    # create_tables, so a sorted page is a walk of that index in either
+    # direction. Status and priority filters have composite indexes leading
+    # with the filtered column for every ordering, so filtered pages are
+    # index walks too. Tasks without a due date sort after those with one;
+    # due dates are ordered by the parsed due_ts, as TaskStore orders them,
+    # so unparseable legacy values count as no due date
+    # Filtered results up to this size are sorted rather than read in order
+    # from a sort index; see _query
+    SMALL_RESULT = 2000
+    SORT_ORDERS = {
+        "title": ("tasks.title COLLATE NOCASE",),
+        "priority": (
+            "CASE tasks.priority WHEN 'High' THEN 0 WHEN 'Medium' THEN 1 ELSE 2 END",
+        ),
+        "due_date": ("(tasks.due_ts IS NULL)", "tasks.due_ts"),
+        "status": ("tasks.status",),
+    }
+
+    def __init__(
+        self, db_path="mindflow_tasks.db", autosave_delay: Optional[float] = None
+    ):
+        self.db_path = Path(db_path)
+        self.logger = logging.getLogger("TaskRepository")
+        # Transactions are managed explicitly (see _write); the autosave
+        # worker commits on its own thread, serialized by _write_lock
+        self.conn = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False
+        )
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._write_lock = threading.RLock()
+        self.create_tables()
+        self.has_search_index = self.create_search_index()
+
+        self.autosave: Optional[AutosaveWorker] = None
+        if autosave_delay is not None:
+            self.autosave = AutosaveWorker(
+                self.commit, delay=autosave_delay, name="TaskRepositoryAutosave"
+            )
+
+    def create_tables(self):
+        """Create the tasks table and its indexes"""
+        with self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    due_date TEXT,
+                    priority TEXT,
+                    status TEXT,
+                    created_at TEXT,
+                    completed_at TEXT,
+                    recurrence TEXT,
+                    dependencies TEXT,
+                    tags TEXT,
+                    project TEXT,
+                    tracked_seconds REAL DEFAULT 0,
+                    due_ts INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS idx_tasks_status_priority
+                    ON tasks (status, priority);
+                CREATE INDEX IF NOT EXISTS idx_tasks_priority
+                    ON tasks (priority);
+                CREATE INDEX IF NOT EXISTS idx_tasks_due_date
+                    ON tasks (due_date);
+                CREATE INDEX IF NOT EXISTS idx_tasks_completed_at
+                    ON tasks (completed_at);
+                CREATE TABLE IF NOT EXISTS migrations (
+                    name TEXT PRIMARY KEY
+                );
+            """
+            )
+        self.add_missing_columns()
+        with self.conn:
+            self.conn.executescript(
+                """
+                CREATE INDEX IF NOT EXISTS idx_tasks_due_ts
+                    ON tasks (due_ts);
+                CREATE INDEX IF NOT EXISTS idx_tasks_recurring
+                    ON tasks (id) WHERE recurrence IS NOT NULL;
+                CREATE INDEX IF NOT EXISTS idx_tasks_with_dependencies
+                    ON tasks (id) WHERE dependencies != '';
+                CREATE INDEX IF NOT EXISTS idx_tasks_title_sort
+                    ON tasks (title COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_tasks_priority_sort
+                    ON tasks ((CASE priority WHEN 'High' THEN 0
+                               WHEN 'Medium' THEN 1 ELSE 2 END));
+                DROP INDEX IF EXISTS idx_tasks_due_sort;
+                DROP INDEX IF EXISTS idx_tasks_status_due_sort;
+                DROP INDEX IF EXISTS idx_tasks_priority_due_sort;
+                CREATE INDEX IF NOT EXISTS idx_tasks_due_ts_sort
+                    ON tasks ((due_ts IS NULL), due_ts);
+                CREATE INDEX IF NOT EXISTS idx_tasks_status_title_sort
+                    ON tasks (status, title COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_tasks_status_priority_sort
+                    ON tasks (status, (CASE priority WHEN 'High' THEN 0
+                                       WHEN 'Medium' THEN 1 ELSE 2 END));
+                CREATE INDEX IF NOT EXISTS idx_tasks_status_due_ts_sort
+                    ON tasks (status, (due_ts IS NULL), due_ts);
+                CREATE INDEX IF NOT EXISTS idx_tasks_priority_title_sort
+                    ON tasks (priority, title COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_tasks_priority_due_ts_sort
+                    ON tasks (priority, (due_ts IS NULL), due_ts);
+                CREATE INDEX IF NOT EXISTS idx_tasks_priority_status_sort
+                    ON tasks (priority, status);
+                CREATE INDEX IF NOT EXISTS idx_tasks_status
+                    ON tasks (status);
+                CREATE INDEX IF NOT EXISTS idx_tasks_project
+                    ON tasks (project);
+                CREATE TABLE IF NOT EXISTS task_tags (
+                    tag TEXT NOT NULL,
+                    task_rowid INTEGER NOT NULL,
+                    PRIMARY KEY (tag, task_rowid)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_task_tags_task_rowid
+                    ON task_tags (task_rowid);
+            """
+            )
+        self.create_tag_triggers()
+
+    def create_tag_triggers(self):
+        """Keep task_tags in line with the comma separated tags column.
+
+        The tags are split with a recursive CTE rather than read as a JSON
+        array, which a tag holding a control character would make
+        malformed. Triggers from older databases that used json_each are
+        replaced.
+        """
+        split_tags = """
+            SELECT tag, new.rowid FROM (
+                WITH RECURSIVE split (tag, rest) AS (
+                    SELECT '', new.tags || ','
+                    UNION ALL
+                    SELECT substr(rest, 1, instr(rest, ',') - 1),
+                           substr(rest, instr(rest, ',') + 1)
+                    FROM split WHERE rest != ''
+                )
+                SELECT tag FROM split WHERE tag != ''
+            )"""
+        outdated = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'tasks' AND sql LIKE '%json_each%'"
+        ).fetchall()
+        with self.conn:
+            for (name,) in outdated:
+                self.conn.execute(f"DROP TRIGGER {name}")
+            self.conn.executescript(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS tasks_tags_insert
+                AFTER INSERT ON tasks WHEN new.tags IS NOT NULL BEGIN
+                    INSERT OR IGNORE INTO task_tags (tag, task_rowid)
+                    {split_tags};
+                END;
+                CREATE TRIGGER IF NOT EXISTS tasks_tags_delete
+                AFTER DELETE ON tasks BEGIN
+                    DELETE FROM task_tags WHERE task_rowid = old.rowid;
+                END;
+                CREATE TRIGGER IF NOT EXISTS tasks_tags_update
+                AFTER UPDATE OF tags ON tasks BEGIN
+                    DELETE FROM task_tags WHERE task_rowid = old.rowid;
+                    INSERT OR IGNORE INTO task_tags (tag, task_rowid)
+                    {split_tags}
+                    WHERE new.tags IS NOT NULL;
+                END;
+            """
+            )
+
+    def add_missing_columns(self):
+        """Migrate databases created before a column was added to COLUMNS"""
+        cursor = self.conn.execute("PRAGMA table_info(tasks)")
+        existing = {row["name"] for row in cursor}
+        for column in self.COLUMNS:
+            if column not in existing:
+                self.logger.info(f"Adding column {column} to tasks table")
+                column_type = self.COLUMN_TYPES.get(column, "TEXT")
+                with self.conn:
+                    self.conn.execute(
+                        f"ALTER TABLE tasks ADD COLUMN {column} {column_type}"
+                    )
+        if "due_ts" not in existing:
+            self.add_due_ts_column()
+
+    def add_due_ts_column(self):
+        """Add due_ts to an older database, parsed from the stored due dates"""
+        self.logger.info("Adding column due_ts to tasks table")
+        with self.conn:
+            self.conn.execute("ALTER TABLE tasks ADD COLUMN due_ts INTEGER")
+            rows = self.conn.execute(
+                "SELECT rowid, due_date FROM tasks WHERE due_date IS NOT NULL"
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE tasks SET due_ts = ? WHERE rowid = ?",
+                ((_due_timestamp(due_date), rowid) for rowid, due_date in rows),
+            )
+
+    def create_search_index(self) -> bool:
+        """Create the full-text index over titles and descriptions.
+
+        Returns False if this SQLite build has no FTS5, in which case
+        searches fall back to LIKE scans.
+        """
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'"
+        ).fetchone()
+        if exists:
+            return True
+
+        try:
+            with self.conn:
+                self.conn.executescript(
+                    """
+                    CREATE VIRTUAL TABLE tasks_fts USING fts5(
+                        title, description,
+                        content='tasks', content_rowid='rowid',
+                        prefix='2 3 4'
+                    );
+                    CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                        INSERT INTO tasks_fts (rowid, title, description)
+                        VALUES (new.rowid, new.title, new.description);
+                    END;
+                    CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                        INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                        VALUES ('delete', old.rowid, old.title, old.description);
+                    END;
+                    CREATE TRIGGER tasks_fts_update
+                    AFTER UPDATE OF title, description ON tasks BEGIN
+                        INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                        VALUES ('delete', old.rowid, old.title, old.description);
+                        INSERT INTO tasks_fts (rowid, title, description)
+                        VALUES (new.rowid, new.title, new.description);
+                    END;
+                    INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild');
+                """
+                )
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"Full-text search unavailable: {e}")
+            return False
+        return True
+
+    @property
+    def schema_version(self) -> int:
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate_from_json(self, json_path="enhanced_tasks.json"):
+        """Import tasks from the JSON snapshot and journal, once.
+
+        Records go through Task, so tags, projects and dates are stored
+        normalized exactly as for tasks added later. The JSON files are
+        left untouched so they can serve as a backup.
+        """
+        if self.schema_version >= 1:
+            return
+
+        records = TaskJournal(json_path).load()
+        tasks = [Task.from_dict(data) for data in records]
+        with self._write():
+            self.conn.executemany(
+                self.INSERT_SQL.replace("INSERT", "INSERT OR IGNORE", 1),
+                (self._row(task) for task in tasks),
+            )
+            self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self.commit()
+        self.logger.info(f"Imported {len(records)} tasks from {json_path}")
+
+    def migrate_from_task_list(self, json_path="tasks.json"):
+        """Import the simple [{"text", "status"}] list of ModernTodoListApp, once.
+
+        The import is recorded in the migrations table in the same
+        transaction as the tasks, and the file is left untouched as a backup.
+        """
+        name = f"task_list:{Path(json_path).name}"
+        if self.conn.execute(
+            "SELECT 1 FROM migrations WHERE name = ?", (name,)
+        ).fetchone():
+            return
+
+        try:
+            with open(json_path, "r") as f:
+                records = json.load(f)
+        except FileNotFoundError:
+            records = []
+
+        tasks = [
+            Task(data.get("text", ""), status=data.get("status", "Pending"))
+            for data in records
+        ]
+        for task in tasks:
+            if task.status == "Completed":
+                task.completed_at = task.created_at
+        with self._write():
+            self.conn.executemany(
+                self.INSERT_SQL, (self._row(task) for task in tasks)
+            )
+            self.conn.execute("INSERT INTO migrations (name) VALUES (?)", (name,))
+        self.commit()
+        self.logger.info(f"Imported {len(tasks)} tasks from {json_path}")
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Task]:
+        cursor = self.conn.execute("SELECT * FROM tasks ORDER BY rowid")
+        return (self._to_task(row) for row in cursor)
+
+    def __contains__(self, task_id: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM tasks WHERE id = ?", (task_id,))
+        return row.fetchone() is not None
+
+    def get(self, task_id: str) -> Optional[Task]:
+        """Return the task with the given id, or None"""
+        row = self.conn.execute(
+            "SELECT * FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        return self._to_task(row) if row else None
+
+    def get_many(self, task_ids: Iterable[str]) -> List[Task]:
+        """Return the tasks with the given ids, skipping unknown ones"""
+        tasks = []
+        for chunk in _chunks(list(task_ids)):
+            cursor = self.conn.execute(
+                f"SELECT * FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            tasks.extend(self._to_task(row) for row in cursor)
+        return tasks
+
+    def add(self, task: Task):
+        """Insert a new task"""
+        with self._write():
+            self.conn.execute(self.INSERT_SQL, self._row(task))
+
+    def add_many(self, tasks: List[Task]) -> List[Task]:
+        """Insert a batch of tasks in one transaction.
+
+        Tasks whose id already exists are skipped; the inserted ones are
+        returned.
+        """
+        ids = [task.id for task in tasks]
+        existing = set()
+        for chunk in _chunks(ids):
+            cursor = self.conn.execute(
+                f"SELECT id FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            existing.update(row[0] for row in cursor)
+
+        new_tasks, seen = [], set(existing)
+        for task in tasks:
+            if task.id not in seen:
+                seen.add(task.id)
+                new_tasks.append(task)
+
+        with self._write():
+            self.conn.executemany(
+                self.INSERT_SQL, (self._row(task) for task in new_tasks)
+            )
+        return new_tasks
+
+    def remove(self, task_id: str) -> Optional[Task]:
+        """Delete and return the task with the given id"""
+        task = self.get(task_id)
+        if task is not None:
+            with self._write():
+                self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        return task
+
+    def remove_many(self, task_ids: Iterable[str]) -> List[Task]:
+        """Delete a batch of tasks in one transaction, returning them"""
+        tasks = self.get_many(task_ids)
+        with self._write():
+            for chunk in _chunks([task.id for task in tasks]):
+                self.conn.execute(
+                    f"DELETE FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+        return tasks
+
+    def update(self, task: Task, **changes) -> Task:
+        """Apply attribute changes to a task and write them to the database"""
+        self._check_fields(changes)
+
+        for field, value in changes.items():
+            setattr(task, field, value)
+        if changes:
+            fields = self._stored_fields(changes)
+            assignments = ", ".join(f"{field} = ?" for field in fields)
+            with self._write():
+                # Stored as the task normalized them, e.g. tags and projects
+                cursor = self.conn.execute(
+                    f"UPDATE tasks SET {assignments} WHERE id = ?",
+                    (*(getattr(task, field) for field in fields), task.id),
+                )
+            if cursor.rowcount == 0:
+                raise KeyError(f"Task {task.id} is not in the repository")
+        return task
+
+    def update_many(self, updates: Iterable[Tuple[Task, Dict]]) -> List[Task]:
+        """Apply a batch of (task, changes) pairs in one transaction.
+
+        Updates touching the same fields share one executemany.
+        """
+        batches: Dict[Tuple[str, ...], List[Tuple]] = {}
+        tasks = []
+        for task, changes in updates:
+            self._check_fields(changes)
+            for field, value in changes.items():
+                setattr(task, field, value)
+            if changes:
+                fields = self._stored_fields(changes)
+                batches.setdefault(fields, []).append(
+                    (*(getattr(task, field) for field in fields), task.id)
+                )
+            tasks.append(task)
+
+        with self._write():
+            for fields, rows in batches.items():
+                assignments = ", ".join(f"{field} = ?" for field in fields)
+                self.conn.executemany(
+                    f"UPDATE tasks SET {assignments} WHERE id = ?", rows
+                )
+        return tasks
+
+    def add_tracked_time(self, task_id: str, seconds: float) -> Optional[float]:
+        """Add stopwatch time to a task's running total and return the new
+        total, or None if there is no such task.
+
+        The increment happens in SQL, so it never overwrites time logged by
+        another connection in the meantime.
+        """
+        with self._write():
+            self.conn.execute(
+                "UPDATE tasks SET tracked_seconds = COALESCE(tracked_seconds, 0) + ? "
+                "WHERE id = ?",
+                (seconds, task_id),
+            )
+            row = self.conn.execute(
+                "SELECT tracked_seconds FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def filter(
+        self,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        tags: Optional[Iterable[str]] = None,
+        project: Optional[str] = None,
+    ) -> List[Task]:
+        """Return tasks matching the given status, priority, tags and project
+        (None = any); a project includes its subprojects.
+
+        With a search query, only tasks whose title or description contain
+        a word starting with each query term are returned, best match
+        first. sort names a column of SORT_ORDERS to order by instead.
+        offset and limit select a window of the ordered result.
+        """
+        sql, params = self._page_query(
+            status, priority, search, sort, descending, tags, project
+        )
+        cursor = self.conn.execute(
+            sql, (*params, -1 if limit is None else limit, offset)
+        )
+        return [self._to_task(row) for row in cursor]
+
+    def count(
+        self,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        search: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+        project: Optional[str] = None,
+    ) -> int:
+        """Number of tasks matching the given filters"""
+        source, where, params, _ = self._query(
+            status, priority, search, tags, project
+        )
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM {source} {where}", params
+        ).fetchone()[0]
+
+    def counts_by(self, field: str) -> Dict[str, int]:
+        """Task counts grouped by status or priority"""
+        if field not in ("status", "priority"):
+            raise ValueError(f"Cannot group tasks by {field}")
+        cursor = self.conn.execute(
+            f"SELECT {field}, COUNT(*) FROM tasks GROUP BY {field}"
+        )
+        return dict(cursor.fetchall())
+
+    def all_tags(self) -> List[str]:
+        """Every tag in use, sorted"""
+        cursor = self.conn.execute("SELECT DISTINCT tag FROM task_tags ORDER BY tag")
+        return [row[0] for row in cursor]
+
+    def all_projects(self) -> List[str]:
+        """Every project in use, including parents of nested ones, sorted"""
+        cursor = self.conn.execute(
+            "SELECT DISTINCT project FROM tasks WHERE project IS NOT NULL"
+        )
+        return sorted(
+            {project for row in cursor for project in project_ancestors(row[0])}
+        )
+
+    def pending_deadlines(self) -> Iterator[Tuple[str, int]]:
+        """(id, due_ts) of every uncompleted task that has a due date"""
+        cursor = self.conn.execute(
+            "SELECT id, due_ts FROM tasks "
+            "WHERE due_ts IS NOT NULL AND status != 'Completed'"
+        )
+        return (tuple(row) for row in cursor)
+
+    def pending_ids(self) -> Iterator[str]:
+        """Ids of every task that is not completed"""
+        cursor = self.conn.execute("SELECT id FROM tasks WHERE status != 'Completed'")
+        return (row[0] for row in cursor)
+
+    def task_dependencies(self) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """(id, status, dependencies) of every task that has dependencies,
+        then (id, status, None) of the other tasks they depend on"""
+        rows = [
+            tuple(row)
+            for row in self.conn.execute(
+                "SELECT id, status, dependencies FROM tasks WHERE dependencies != ''"
+            )
+        ]
+        referenced = {dep for row in rows for dep in row[2].split(",")}
+        referenced.difference_update(row[0] for row in rows)
+        for chunk in _chunks(list(referenced)):
+            cursor = self.conn.execute(
+                "SELECT id, status, NULL FROM tasks "
+                f"WHERE id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            rows.extend(tuple(row) for row in cursor)
+        return iter(rows)
+
+    def recurring(self) -> List[Task]:
+        """Tasks that carry a repeat rule"""
+        cursor = self.conn.execute(
+            "SELECT * FROM tasks WHERE recurrence IS NOT NULL ORDER BY rowid"
+        )
+        return [self._to_task(row) for row in cursor]
+
+    def completed_before(
+        self, end: str, limit: Optional[int] = None
+    ) -> List[Task]:
+        """Completed tasks whose completed_at is before end"""
+        cursor = self.conn.execute(
+            "SELECT * FROM tasks WHERE completed_at < ? AND status = 'Completed' "
+            "ORDER BY completed_at LIMIT ?",
+            (end, -1 if limit is None else limit),
+        )
+        return [self._to_task(row) for row in cursor]
+
+    def due_between(
+        self, start: Optional[str] = None, end: Optional[str] = None
+    ) -> List[Task]:
+        """Return tasks with start <= due_date < end, ordered by due date.
+
+        Dates are compared as parsed instants, so a date-only due date
+        equals midnight; legacy due dates that do not parse are left out.
+        """
+        clauses = ["due_ts IS NOT NULL"]
+        params = []
+        if start is not None:
+            clauses.append("due_ts >= ?")
+            params.append(parse_timestamp(start))
+        if end is not None:
+            clauses.append("due_ts < ?")
+            params.append(parse_timestamp(end))
+        cursor = self.conn.execute(
+            f"SELECT * FROM tasks WHERE {' AND '.join(clauses)} "
+            "ORDER BY due_ts, id",
+            params,
+        )
+        return [self._to_task(row) for row in cursor]
+
+    def commit(self):
+        """Commit pending writes"""
+        with self._write_lock:
+            if self.conn.in_transaction:
+                self.conn.commit()
+
+    def close(self):
+        """Commit pending writes and close the database"""
+        if self.autosave is not None:
+            self.autosave.stop()
+            self.autosave = None
+        self.commit()
+        self.conn.close()
+
+    @contextmanager
+    def _write(self):
+        """Run a group of statements atomically.
+
+        Each group is a savepoint inside the current transaction, so a
+        failing group is undone without losing the writes still waiting
+        for the autosave commit.
+        """
+        with self._write_lock:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            self.conn.execute("SAVEPOINT write")
+            try:
+                yield
+            except BaseException:
+                self.conn.execute("ROLLBACK TO write")
+                self.conn.execute("RELEASE write")
+                raise
+            self.conn.execute("RELEASE write")
+        if self.autosave is None:
+            self.commit()
+        else:
+            self.autosave.mark_dirty()
+
+    def _query(
+        self,
+        status: Optional[str],
+        priority: Optional[str],
+        search: Optional[str],
+        tags: Optional[Iterable[str]] = None,
+        project: Optional[str] = None,
+        ordered: bool = False,
+    ):
+        """FROM source, WHERE clause, parameters and ORDER BY for a filter.
+
+        When ordered, a tag or project condition matching more than
+        SMALL_RESULT tasks is marked with unary ``+`` so SQLite cannot
+        drive the query from it: a sorted page is then read in order from a
+        sort index and filtered as it goes, instead of sorting every match
+        in a temporary B-tree. Smaller sets are cheaper to fetch and sort.
+        """
+        source, order = "tasks", "tasks.rowid"
+        clauses, params = [], []
+        terms = search_terms(search or "")
+        if terms and self.has_search_index:
+            source = "tasks_fts JOIN tasks ON tasks.rowid = tasks_fts.rowid"
+            clauses.append("tasks_fts MATCH ?")
+            params.append(" ".join(f'"{term}"*' for term in terms))
+            # Title matches weigh more than description matches
+            order = "bm25(tasks_fts, 10.0, 1.0), tasks.rowid"
+        else:
+            for term in terms:
+                clauses.append("(tasks.title LIKE ? OR tasks.description LIKE ?)")
+                params.extend([f"%{term}%"] * 2)
+        if status is not None:
+            clauses.append("tasks.status = ?")
+            params.append(status)
+        if priority is not None:
+            clauses.append("tasks.priority = ?")
+            params.append(priority)
+        for tag in sorted(parse_tags(tags)):
+            residual = ordered and not self._few_matches(
+                "task_tags WHERE tag = ?", [tag]
+            )
+            clauses.append(
+                f"{'+' if residual else ''}tasks.rowid IN "
+                "(SELECT task_rowid FROM task_tags WHERE tag = ?)"
+            )
+            params.append(tag)
+        if project is not None:
+            # Subprojects sort between "project/" and "project0"
+            project = normalize_project(project)
+            project_params = [project, f"{project}/", f"{project}0"]
+            residual = ordered and not self._few_matches(
+                "tasks WHERE project = ? OR (project >= ? AND project < ?)",
+                project_params,
+            )
+            column = "+tasks.project" if residual else "tasks.project"
+            clauses.append(
+                f"({column} = ? OR ({column} >= ? AND {column} < ?))"
+            )
+            params.extend(project_params)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return source, where, params, order
+
+    def _row(self, task: Task) -> Tuple:
+        """Values of STORED_COLUMNS for a task"""
+        data = task.to_dict()
+        return (*(data[column] for column in self.COLUMNS), task.due_ts)
+
+    @staticmethod
+    def _stored_fields(changes: Dict) -> Tuple[str, ...]:
+        """Columns to write for changed fields, with due_ts following due_date"""
+        fields = tuple(changes)
+        return fields + ("due_ts",) if "due_date" in changes else fields
+
+    def _page_query(
+        self,
+        status: Optional[str],
+        priority: Optional[str],
+        search: Optional[str],
+        sort: Optional[str],
+        descending: bool,
+        tags: Optional[Iterable[str]],
+        project: Optional[str],
+    ) -> Tuple[str, List]:
+        """SELECT for a page of filter(), ending in LIMIT ? OFFSET ?"""
+        source, where, params, order = self._query(
+            status, priority, search, tags, project, ordered=sort is not None
+        )
+        if sort is not None:
+            # A filter on the sort column leaves only the rowid to order by
+            filtered = {"status": status, "priority": priority}.get(sort)
+            order = self._sort_order(sort, descending, filtered is not None)
+        sql = (
+            f"SELECT tasks.* FROM {source} {where} ORDER BY {order} "
+            "LIMIT ? OFFSET ?"
+        )
+        return sql, params
+
+    def _few_matches(self, source: str, params: List) -> bool:
+        """Whether "SELECT ... FROM source" has at most SMALL_RESULT rows,
+        counting no further than that"""
+        row = self.conn.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM {source} LIMIT ?)",
+            (*params, self.SMALL_RESULT + 1),
+        ).fetchone()
+        return row[0] <= self.SMALL_RESULT
+
+    def _check_fields(self, changes: Dict):
+        unknown = set(changes) - set(self.COLUMNS[1:])
+        if unknown:
+            raise AttributeError(f"Cannot update task fields: {sorted(unknown)}")
+
+    def _sort_order(self, sort: str, descending: bool, constant: bool = False) -> str:
+        if sort not in self.SORT_ORDERS:
+            raise ValueError(f"Cannot sort tasks by {sort}")
+        direction = " DESC" if descending else ""
+        terms = () if constant else self.SORT_ORDERS[sort]
+        terms = (*terms, "tasks.rowid")
+        return ", ".join(term + direction for term in terms)
+
+    @staticmethod
+    def _to_task(row: sqlite3.Row) -> Task:
+        return Task.from_dict(dict(row))
+
+
+def _due_timestamp(due_date: Optional[str]) -> Optional[int]:
+    """due_ts for a stored due date; None for legacy values that do not parse"""
+    try:
+        return parse_timestamp(due_date)
+    except ValueError:
+        return None
+
+
+def _chunks(items: List, size: int = 900) -> Iterator[List]:
+    """Slices small enough for SQLite's bound-parameter limit"""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
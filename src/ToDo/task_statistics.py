@@ -0,0 +1,84 @@
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Set
+
+from ToDo.due_heap import DueHeap
+from ToDo.task import to_timestamp
+
+
+class TaskStatistics:
+    """Incrementally maintained task statistics.
+
+    Counters by status and priority are adjusted on every add and remove.
+    Due dates of tasks that are not completed sit in a DueHeap; as time
+    passes, entries whose deadline is behind us are popped into an overdue
+    set, so the overdue count costs O(log n) per task that became overdue
+    since the last query instead of a scan over every task.
+
+    The heap is keyed by the tasks' numeric ``due_ts``, as the store keeps
+    it, so no date string is parsed. Unparseable dates have none and are
+    ignored.
+    """
+
+    def __init__(self):
+        self.by_status: Counter = Counter()
+        self.by_priority: Counter = Counter()
+        self._deadlines = DueHeap()
+        self._overdue: Set[str] = set()
+
+    @classmethod
+    def from_store(cls, store) -> "TaskStatistics":
+        """Seed statistics from a TaskStore or TaskRepository"""
+        stats = cls()
+        stats.by_status.update(store.counts_by("status"))
+        stats.by_priority.update(store.counts_by("priority"))
+        stats._deadlines.load(store.pending_deadlines())
+        return stats
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_status.values())
+
+    @property
+    def completed(self) -> int:
+        return self.by_status["Completed"]
+
+    @property
+    def pending(self) -> int:
+        return self.total - self.completed
+
+    @property
+    def completion_rate(self) -> float:
+        total = self.total
+        return self.completed / total * 100 if total else 0.0
+
+    def add(self, task):
+        """Count a task that was added or whose new state was saved"""
+        self.by_status[task.status] += 1
+        self.by_priority[task.priority] += 1
+        if task.status != "Completed" and task.due_ts is not None:
+            self._deadlines.push(task.id, task.due_ts)
+
+    def remove(self, task):
+        """Uncount a task that was deleted or is about to change"""
+        self._decrement(self.by_status, task.status)
+        self._decrement(self.by_priority, task.priority)
+        self._deadlines.discard(task.id)
+        self._overdue.discard(task.id)
+
+    def overdue(self, now: Optional[datetime] = None) -> int:
+        """Number of uncompleted tasks whose due date has passed"""
+        now_ts = to_timestamp(now or datetime.now())
+        while True:
+            entry = self._deadlines.peek()
+            if entry is None or entry[0] >= now_ts:
+                break
+            self._deadlines.pop()
+            self._overdue.add(entry[1])
+        return len(self._overdue)
+
+    @staticmethod
+    def _decrement(counter: Counter, key: str):
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
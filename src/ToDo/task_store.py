@@ -0,0 +1,396 @@
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ToDo.task import (
+    PRIORITIES,
+    matches_search,
+    normalize_project,
+    parse_tags,
+    parse_timestamp,
+    project_ancestors,
+    search_terms,
+)
+
+if TYPE_CHECKING:
+    from ToDo.task import Task
+
+
+class TaskStore:
+    """In-memory task collection keyed by id with secondary indexes.
+
+    Tasks are kept in an id-keyed dict (insertion order is display order)
+    and indexed by status, priority, tag, project and due date so lookups,
+    filters and deletes never have to scan the whole list. A task is in the
+    bucket of its own project and of every project above it, so a filter
+    on a project includes its subprojects at no extra cost.
+
+    Each sortable column also has a presorted index of (sort key, insertion
+    sequence, id) entries, updated by bisection on every change, so a
+    sorted page in either direction is a walk of that list.
+    """
+
+    INDEXED_FIELDS = frozenset(
+        (
+            "title",
+            "status",
+            "priority",
+            "due_date",
+            "due_ts",
+            "recurrence",
+            "rule",
+            "tags",
+            "tag_set",
+            "project",
+        )
+    )
+    SORT_KEYS = {
+        "title": lambda task: task.title.casefold(),
+        "priority": lambda task: (
+            PRIORITIES.index(task.priority)
+            if task.priority in PRIORITIES
+            else len(PRIORITIES)
+        ),
+        # Tasks without a due date sort after those with one
+        "due_date": lambda task: (task.due_ts is None, task.due_ts or 0),
+        "status": lambda task: task.status,
+    }
+
+    def __init__(self, tasks=None):
+        self._tasks: Dict[str, "Task"] = {}
+        # Dicts are used as insertion-ordered sets of task ids
+        self._by_status: Dict[str, Dict[str, None]] = {}
+        self._by_priority: Dict[str, Dict[str, None]] = {}
+        self._by_tag: Dict[str, Dict[str, None]] = {}
+        self._by_project: Dict[str, Dict[str, None]] = {}
+        # Sorted (due_ts, id) pairs
+        self._by_due_date: List[Tuple[int, str]] = []
+        self._recurring: Dict[str, None] = {}
+        self._sorted: Dict[str, List[Tuple]] = {
+            field: [] for field in self.SORT_KEYS
+        }
+        self._seq: Dict[str, int] = {}  # task id -> insertion sequence
+        self._next_seq = 0
+
+        if tasks:
+            self.load(tasks)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator["Task"]:
+        return iter(self._tasks.values())
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._tasks
+
+    def load(self, tasks):
+        """Replace the contents of the store with the given tasks"""
+        self.clear()
+        for task in tasks:
+            if task.id in self._tasks:
+                raise KeyError(f"Task {task.id} is already in the store")
+            self._tasks[task.id] = task
+            self._index(task, presorted=False)
+        # Sort the sorted indexes once instead of bisecting per task
+        self._by_due_date.sort()
+        for entries in self._sorted.values():
+            entries.sort()
+
+    def clear(self):
+        self._tasks.clear()
+        self._by_status.clear()
+        self._by_priority.clear()
+        self._by_tag.clear()
+        self._by_project.clear()
+        self._by_due_date.clear()
+        self._recurring.clear()
+        for entries in self._sorted.values():
+            entries.clear()
+        self._seq.clear()
+
+    def get(self, task_id: str) -> Optional["Task"]:
+        """Return the task with the given id, or None"""
+        return self._tasks.get(task_id)
+
+    def get_many(self, task_ids: Iterable[str]) -> List["Task"]:
+        """Return the tasks with the given ids, skipping unknown ones"""
+        return [self._tasks[task_id] for task_id in task_ids if task_id in self._tasks]
+
+    def add(self, task: "Task"):
+        """Add a task to the store"""
+        if task.id in self._tasks:
+            raise KeyError(f"Task {task.id} is already in the store")
+        self._tasks[task.id] = task
+        self._index(task)
+
+    def add_many(self, tasks: List["Task"]) -> List["Task"]:
+        """Add a batch of tasks, skipping ids already in the store.
+
+        Returns the tasks that were added.
+        """
+        added = []
+        for task in tasks:
+            if task.id not in self._tasks:
+                self.add(task)
+                added.append(task)
+        return added
+
+    def remove(self, task_id: str) -> Optional["Task"]:
+        """Remove and return the task with the given id"""
+        task = self._tasks.pop(task_id, None)
+        if task is not None:
+            self._unindex(task)
+            del self._seq[task_id]
+        return task
+
+    def remove_many(self, task_ids: Iterable[str]) -> List["Task"]:
+        """Remove a batch of tasks, returning the ones that existed"""
+        removed = []
+        for task_id in task_ids:
+            task = self.remove(task_id)
+            if task is not None:
+                removed.append(task)
+        return removed
+
+    def update(self, task: "Task", **changes) -> "Task":
+        """Apply attribute changes to a stored task, keeping indexes in sync"""
+        if self._tasks.get(task.id) is not task:
+            raise KeyError(f"Task {task.id} is not in the store")
+
+        reindex = not self.INDEXED_FIELDS.isdisjoint(changes)
+        if reindex:
+            self._unindex(task)
+        for field, value in changes.items():
+            setattr(task, field, value)
+        if reindex:
+            self._index(task)
+        return task
+
+    def update_many(self, updates: Iterable[Tuple["Task", Dict]]) -> List["Task"]:
+        """Apply a batch of (task, changes) pairs"""
+        return [self.update(task, **changes) for task, changes in updates]
+
+    def add_tracked_time(self, task_id: str, seconds: float) -> Optional[float]:
+        """Add stopwatch time to a task's running total and return the new
+        total, or None if there is no such task"""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None
+        task.tracked_seconds += seconds
+        return task.tracked_seconds
+
+    def filter(
+        self,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        search: Optional[str] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        tags: Optional[Iterable[str]] = None,
+        project: Optional[str] = None,
+    ) -> List["Task"]:
+        """Return tasks matching the given status, priority, tags and project.
+
+        A value of None means "any"; a task must carry every tag given.
+        Only the smallest of the matching index buckets is walked; the
+        others are used for O(1) membership checks. A search query is
+        checked per candidate task, so unlike the index filters it costs
+        a scan. With sort, the column's sorted index is walked instead,
+        forwards or backwards. offset and limit select a window of the
+        result.
+        """
+        stop = None if limit is None else offset + limit
+        tasks = self._matching(
+            status, priority, search, sort, descending, tags, project
+        )
+        return list(islice(tasks, offset, stop))
+
+    def count(
+        self,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        search: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+        project: Optional[str] = None,
+    ) -> int:
+        """Number of tasks matching the given filters"""
+        if not (search_terms(search or "") or tags or project):
+            if priority is None:
+                if status is None:
+                    return len(self._tasks)
+                return len(self._by_status.get(status, ()))
+            if status is None:
+                return len(self._by_priority.get(priority, ()))
+        tasks = self._matching(status, priority, search, tags=tags, project=project)
+        return sum(1 for _ in tasks)
+
+    def counts_by(self, field: str) -> Dict[str, int]:
+        """Task counts grouped by status or priority"""
+        index = {"status": self._by_status, "priority": self._by_priority}[field]
+        return {key: len(bucket) for key, bucket in index.items()}
+
+    def all_tags(self) -> List[str]:
+        """Every tag in use, sorted"""
+        return sorted(self._by_tag)
+
+    def all_projects(self) -> List[str]:
+        """Every project in use, including parents of nested ones, sorted"""
+        return sorted(self._by_project)
+
+    def pending_deadlines(self) -> Iterator[Tuple[str, int]]:
+        """(id, due_ts) of every uncompleted task that has a due date"""
+        for due_ts, task_id in self._by_due_date:
+            if self._tasks[task_id].status != "Completed":
+                yield task_id, due_ts
+
+    def pending_ids(self) -> Iterator[str]:
+        """Ids of every task that is not completed"""
+        for status, task_ids in self._by_status.items():
+            if status != "Completed":
+                yield from task_ids
+
+    def task_dependencies(self) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """(id, status, dependencies) of every task that has dependencies,
+        then (id, status, None) of the other tasks they depend on"""
+        linked = [task for task in self._tasks.values() if task.dependencies]
+        referenced = {dep for task in linked for dep in task.depends_on}
+        for task in linked:
+            referenced.discard(task.id)
+            yield task.id, task.status, task.dependencies
+        for task in self.get_many(referenced):
+            yield task.id, task.status, None
+
+    def completed_before(
+        self, end: str, limit: Optional[int] = None
+    ) -> List["Task"]:
+        """Completed tasks whose completed_at is before end"""
+        end_ts = parse_timestamp(end)
+        tasks = (
+            self._tasks[task_id]
+            for task_id in self._by_status.get("Completed", ())
+            if self._tasks[task_id].completed_ts is not None
+            and self._tasks[task_id].completed_ts < end_ts
+        )
+        return list(islice(tasks, limit))
+
+    def due_between(
+        self, start: Optional[str] = None, end: Optional[str] = None
+    ) -> List["Task"]:
+        """Return tasks with start <= due_date < end, ordered by due date"""
+        lo = (
+            0
+            if start is None
+            else bisect_left(self._by_due_date, (parse_timestamp(start),))
+        )
+        hi = (
+            len(self._by_due_date)
+            if end is None
+            else bisect_left(self._by_due_date, (parse_timestamp(end),))
+        )
+        return [self._tasks[task_id] for _, task_id in self._by_due_date[lo:hi]]
+
+    def recurring(self) -> List["Task"]:
+        """Tasks that carry a repeat rule"""
+        return [self._tasks[task_id] for task_id in self._recurring]
+
+    def _matching(
+        self,
+        status: Optional[str],
+        priority: Optional[str],
+        search: Optional[str],
+        sort: Optional[str] = None,
+        descending: bool = False,
+        tags: Optional[Iterable[str]] = None,
+        project: Optional[str] = None,
+    ) -> Iterator["Task"]:
+        buckets = []
+        if status is not None:
+            buckets.append(self._by_status.get(status, {}))
+        if priority is not None:
+            buckets.append(self._by_priority.get(priority, {}))
+        for tag in parse_tags(tags):
+            buckets.append(self._by_tag.get(tag, {}))
+        if project is not None:
+            buckets.append(self._by_project.get(normalize_project(project), {}))
+        buckets.sort(key=len)
+
+        if sort is not None:
+            if sort not in self._sorted:
+                raise ValueError(f"Cannot sort tasks by {sort}")
+            entries = self._sorted[sort]
+            if descending:
+                entries = reversed(entries)
+            ids = (entry[-1] for entry in entries)
+            tasks = (
+                self._tasks[task_id]
+                for task_id in ids
+                if all(task_id in bucket for bucket in buckets)
+            )
+        elif not buckets:
+            tasks = iter(self._tasks.values())
+        else:
+            smallest, others = buckets[0], buckets[1:]
+            tasks = (
+                self._tasks[task_id]
+                for task_id in smallest
+                if all(task_id in bucket for bucket in others)
+            )
+
+        terms = search_terms(search or "")
+        if terms:
+            tasks = (task for task in tasks if matches_search(task, terms))
+        return tasks
+
+    def _index(self, task: "Task", presorted: bool = True):
+        """Add a task to every index; with presorted=False sorted indexes
+        are appended to and must be sorted by the caller"""
+        add = insort if presorted else list.append
+        self._by_status.setdefault(task.status, {})[task.id] = None
+        self._by_priority.setdefault(task.priority, {})[task.id] = None
+        for tag in task.tag_set:
+            self._by_tag.setdefault(tag, {})[task.id] = None
+        for project in project_ancestors(task.project):
+            self._by_project.setdefault(project, {})[task.id] = None
+        if task.due_ts is not None:
+            add(self._by_due_date, (task.due_ts, task.id))
+        if task.rule is not None:
+            self._recurring[task.id] = None
+
+        seq = self._seq.get(task.id)
+        if seq is None:
+            seq = self._seq[task.id] = self._next_seq
+            self._next_seq += 1
+        for field, key in self.SORT_KEYS.items():
+            add(self._sorted[field], (key(task), seq, task.id))
+
+    def _unindex(self, task: "Task"):
+        self._discard(self._by_status, task.status, task.id)
+        self._discard(self._by_priority, task.priority, task.id)
+        for tag in task.tag_set:
+            self._discard(self._by_tag, tag, task.id)
+        for project in project_ancestors(task.project):
+            self._discard(self._by_project, project, task.id)
+        self._recurring.pop(task.id, None)
+        if task.due_ts is not None:
+            key = (task.due_ts, task.id)
+            i = bisect_left(self._by_due_date, key)
+            if i < len(self._by_due_date) and self._by_due_date[i] == key:
+                del self._by_due_date[i]
+        seq = self._seq[task.id]
+        for field, key in self.SORT_KEYS.items():
+            entries = self._sorted[field]
+            entry = (key(task), seq, task.id)
+            i = bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                del entries[i]
+
+    @staticmethod
+    def _discard(index: Dict[str, Dict[str, None]], key: str, task_id: str):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(task_id, None)
+            if not bucket:
+                del index[key]
@@ -0,0 +1,215 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ToDo.task import PRIORITIES, STATUSES, Task, parse_timestamp
+
+FIELDS = (
+    "id",
+    "title",
+    "description",
+    "due_date",
+    "priority",
+    "status",
+    "created_at",
+    "completed_at",
+    "recurrence",
+    "dependencies",
+    "tags",
+    "project",
+    "tracked_seconds",
+)
+MAX_REPORTED_ERRORS = 100
+
+
+def is_csv(path) -> bool:
+    return Path(path).suffix.lower() == ".csv"
+
+
+def task_from_record(data: Dict) -> Task:
+    """Validate an imported record and build a Task from it.
+
+    Raises ValueError describing the first problem found.
+    """
+    title = _text(data, "title").strip()
+    if not title:
+        raise ValueError("missing title")
+
+    priority = (_text(data, "priority").strip() or "Medium").capitalize()
+    if priority not in PRIORITIES:
+        raise ValueError(f"unknown priority {priority!r}")
+    status = (_text(data, "status").strip() or "Pending").capitalize()
+    if status not in STATUSES:
+        raise ValueError(f"unknown status {status!r}")
+
+    due_date = _text(data, "due_date").strip() or None
+    parse_timestamp(due_date)
+
+    task = Task(
+        title,
+        description=_text(data, "description"),
+        due_date=due_date,
+        priority=priority,
+        status=status,
+        recurrence=_text(data, "recurrence").strip() or None,
+        dependencies=_text_list(data, "dependencies") or None,
+        tags=_text_list(data, "tags") or None,
+        project=_text(data, "project") or None,
+    )
+    if data.get("id"):
+        task.id = str(data["id"])
+    if data.get("created_at"):
+        task.created_at = _text(data, "created_at")
+    if data.get("completed_at"):
+        task.completed_at = _text(data, "completed_at")
+    tracked_seconds = data.get("tracked_seconds") or 0.0
+    try:
+        if isinstance(tracked_seconds, bool) or not isinstance(
+            tracked_seconds, (int, float, str)
+        ):
+            raise ValueError
+        task.tracked_seconds = float(tracked_seconds)
+    except ValueError:
+        raise ValueError(f"invalid tracked time {tracked_seconds!r}") from None
+    return task
+
+
+def _text(data: Dict, field: str) -> str:
+    """A text field of a record, "" if missing; raises ValueError otherwise"""
+    value = data.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"invalid {field} {value!r}")
+    return value
+
+
+def _text_list(data: Dict, field: str):
+    """A field given as comma separated text or as a list of strings"""
+    value = data.get(field)
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return value
+    return _text(data, field)
+
+
+class TaskImporter:
+    """Streams tasks from a CSV or JSON-lines file into a store.
+
+    Records are parsed lazily and inserted at most ``batch_size`` at a
+    time, so memory stays bounded by one batch whatever the file size.
+    ``run()`` yields after each batch so the caller can report progress and
+    keep an event loop responsive between batches.
+
+    With ``time_slice`` set, the batch size adapts so that parsing and
+    inserting one batch takes about that many seconds, which keeps each
+    step short enough for an event loop to stay smooth.
+
+    A TodoCore is given the batches through ``import_many``, which keeps
+    them out of the undo history.
+    """
+
+    def __init__(
+        self,
+        store,
+        path,
+        batch_size: int = 2000,
+        time_slice: Optional[float] = None,
+    ):
+        self.store = store
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.time_slice = time_slice
+        self._insert = getattr(store, "import_many", store.add_many)
+        self.imported = 0
+        self.skipped = 0
+        self.error_count = 0
+        self.errors: List[str] = []
+        self._exhausted = False
+
+    def run(self) -> Iterator[Tuple[List[Task], float]]:
+        """Import the file, yielding (inserted tasks, fraction done) per batch"""
+        size = self.path.stat().st_size or 1
+        # Time-sliced imports start small and grow to fill the slice
+        batch_size = self.batch_size if self.time_slice is None else 50
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            records = self._records(f)
+            while True:
+                started = time.perf_counter()
+                batch = list(self._validated(islice(records, batch_size)))
+                if not batch and self._exhausted:
+                    break
+                inserted = self._insert(batch)
+                self.imported += len(inserted)
+                self.skipped += len(batch) - len(inserted)
+                if self.time_slice is not None and batch:
+                    elapsed = max(time.perf_counter() - started, 1e-6)
+                    batch_size = self._next_batch_size(batch_size, elapsed)
+                yield inserted, min(f.buffer.tell() / size, 1.0)
+
+    def _next_batch_size(self, batch_size: int, elapsed: float) -> int:
+        """Scale the batch towards the time slice, at most doubling per step"""
+        scaled = int(batch_size * min(self.time_slice / elapsed, 2.0))
+        return max(1, min(scaled, self.batch_size))
+
+    def _records(self, f) -> Iterator[Tuple[int, Dict]]:
+        """(line number, raw record) pairs; parse errors are recorded"""
+        self._exhausted = False
+        if is_csv(self.path):
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_num, json.loads(line)
+                except ValueError as e:
+                    self._error(line_num, f"invalid JSON ({e})")
+        self._exhausted = True
+
+    def _validated(self, records) -> Iterator[Task]:
+        for line_num, record in records:
+            try:
+                yield task_from_record(record)
+            except (AttributeError, TypeError, ValueError) as e:
+                self._error(line_num, str(e))
+
+    def _error(self, line_num: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Line {line_num}: {message}")
+
+
+class TaskExporter:
+    """Streams every task of a store to a CSV or JSON-lines file"""
+
+    def __init__(self, store, path, batch_size: int = 5000):
+        self.store = store
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.exported = 0
+
+    def run(self) -> Iterator[Tuple[int, float]]:
+        """Write the file, yielding (tasks written, fraction done) per batch"""
+        total = len(self.store) or 1
+        tasks = iter(self.store)
+        with open(self.path, "w", newline="", encoding="utf-8") as f:
+            if is_csv(self.path):
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                write = writer.writerow
+            else:
+                write = lambda data: f.write(json.dumps(data) + "\n")
+
+            while True:
+                batch = list(islice(tasks, self.batch_size))
+                if not batch:
+                    break
+                for task in batch:
+                    write(task.to_dict())
+                self.exported += len(batch)
+                yield self.exported, min(self.exported / total, 1.0)
@@ -3,6 +3,11 @@ from ttkbootstrap.constants import *
 import json
 from tkinter import messagebox
 
+from ToDo.task import Task
+from ToDo.task_repository import TaskRepository
+from ToDo.todo_core import TodoCore
+from ToDo.virtual_tree import VirtualTreeview
+
 class ModernTodoListApp:
     def __init__(self, master):
         self.master = master
@@ -10,6 +15,11 @@ class ModernTodoListApp:
         # Create main container
         self.main_container = ttk.Frame(master)
         self.main_container.pack(fill="both", expand=True)
+        self.main_container.bind("<Destroy>", self.on_destroy)
+
+        # Tasks live in the same database as EnhancedTodoList; the autosave
+        # worker commits changes in the background
+        self.store = TaskRepository("mindflow_tasks.db", autosave_delay=0.5)
         
         # Create style object
         self.style = ttk.Style()
@@ -50,9 +60,10 @@ class ModernTodoListApp:
 
         ttk.Button(input_frame, text="Add", command=self.add_task, bootstyle="success").grid(row=0, column=1, padx=(10, 0))
 
-        # Task list
-        self.task_tree = ttk.Treeview(self.main_container, columns=("Task", "Status"), show="headings", selectmode="browse")
-        self.task_tree.grid(row=2, column=0, sticky="nsew", padx=20, pady=10)
+        # Task list; only the visible rows exist as Treeview items
+        self.task_view = VirtualTreeview(self.main_container, row_key=lambda task: task.id, render_row=self.render_row, columns=("Task", "Status"), show="headings", selectmode="browse")
+        self.task_view.grid(row=2, column=0, columnspan=2, sticky="nsew", padx=20, pady=10)
+        self.task_tree = self.task_view.tree
         self.task_tree.heading("Task", text="Task")
         self.task_tree.heading("Status", text="Status")
         self.task_tree.column("Task", width=300)
@@ -61,11 +72,6 @@ class ModernTodoListApp:
         # Configure tag for completed tasks
         self.task_tree.tag_configure("completed", foreground="green")
 
-        # Scrollbar for task list
-        scrollbar = ttk.Scrollbar(self.main_container, orient="vertical", command=self.task_tree.yview)
-        scrollbar.grid(row=2, column=1, sticky="ns")
-        self.task_tree.configure(yscrollcommand=scrollbar.set)
-
         # Buttons
         button_frame = ttk.Frame(self.main_container)
         button_frame.grid(row=3, column=0, sticky="ew", padx=20, pady=(0, 20))
@@ -75,37 +81,41 @@ class ModernTodoListApp:
         ttk.Button(button_frame, text="Delete", bootstyle="danger", command=self.delete_task).grid(row=0, column=1, padx=5)
         ttk.Button(button_frame, text="View Stats", bootstyle="info", command=self.view_stats).grid(row=0, column=2, padx=5)
 
-    # All other methods remain the same, just change self to self.main_container where needed
+    def render_row(self, task):
+        return (task.title, task.status), ("completed",) if task.status == "Completed" else ()
+
+    def selected_task(self):
+        selected = self.task_view.selected_keys()
+        return self.core.get(selected[0]) if selected else None
+
     def add_task(self):
-        task = self.task_input.get().strip()
-        if task and task != "Enter your task here...":
-            self.task_tree.insert("", "end", values=(task, "Pending"))
+        title = self.task_input.get().strip()
+        if title and title != "Enter your task here...":
+            task = self.core.add(Task(title))
+            self.task_view.insert(task)
             self.task_input.delete(0, "end")
-            self.save_tasks()
         else:
             messagebox.showwarning("Invalid Task", "Please enter a valid task.")
 
     def mark_done(self):
-        selected_item = self.task_tree.selection()
-        if selected_item:
-            self.task_tree.set(selected_item, "Status", "Completed")
-            self.task_tree.item(selected_item, tags=("completed",))
-            self.save_tasks()
+        task = self.selected_task()
+        if task:
+            self.task_view.update(self.core.complete(task))
         else:
             messagebox.showwarning("No Selection", "Please select a task to mark as done.")
 
     def delete_task(self):
-        selected_item = self.task_tree.selection()
-        if selected_item:
-            self.task_tree.delete(selected_item)
-            self.save_tasks()
+        task = self.selected_task()
+        if task:
+            self.core.delete(task.id)
+            self.task_view.remove(task.id)
         else:
             messagebox.showwarning("No Selection", "Please select a task to delete.")
 
     def view_stats(self):
-        total_count = len(self.task_tree.get_children())
-        done_count = len([item for item in self.task_tree.get_children() 
-                         if self.task_tree.item(item)["values"][1] == "Completed"])
+        # Kept up to date by the core as tasks change, so no scan is needed
+        total_count = self.core.statistics.total
+        done_count = self.core.statistics.completed
         messagebox.showinfo("Task Statistics", 
                           f"Total tasks: {total_count}\nCompleted tasks: {done_count}")
 
@@ -118,26 +128,17 @@ class ModernTodoListApp:
             self.task_input.insert(0, "Enter your task here...")
 
     def load_tasks(self):
+        """Import the old tasks.json list on first run and show the tasks"""
         try:
-            with open("tasks.json", "r") as f:
-                data = json.load(f)
-                for task in data:
-                    text = task.get("text", "")
-                    status = task.get("status", "Pending")
-                    self.task_tree.insert("", "end", values=(text, status))
-                    if status == "Completed":
-                        self.task_tree.item(self.task_tree.get_children()[-1], 
-                                          tags=("completed",))
-        except FileNotFoundError:
-            pass
+            self.store.migrate_from_task_list("tasks.json")
         except json.JSONDecodeError:
             messagebox.showerror("Error", 
-                               "The tasks file is corrupted. Starting with an empty task list.")
-
-    def save_tasks(self):
-        data = []
-        for item in self.task_tree.get_children():
-            text, status = self.task_tree.item(item)["values"]
-            data.append({"text": text, "status": status})
-        with open("tasks.json", "w") as f:
-            json.dump(data, f)
\ No newline at end of file
+                               "The tasks file is corrupted. Skipping import of old tasks.")
+        self.core = TodoCore(self.store)
+        query = self.core.query()
+        self.task_view.set_source(count=query.count, fetch=query.fetch, matches=query.matches)
+
+    def on_destroy(self, event):
+        if event.widget is self.main_container:
+            # Commits whatever the autosave worker has not written yet
+            self.core.close()
\ No newline at end of file
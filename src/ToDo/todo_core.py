@@ -0,0 +1,457 @@
+"""Headless ToDo API.
+
+Everything the task list does apart from drawing it: the Task model, the
+stores, filtering and statistics. Nothing here imports Tk, so the same
+code paths can be scripted and benchmarked without a display.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ToDo.recurrence import Recurrence
+from ToDo.task import (
+    PRIORITIES,
+    STATUSES,
+    Task,
+    format_due,
+    matches_search,
+    normalize_project,
+    parse_tags,
+    parse_timestamp,
+    project_ancestors,
+    search_terms,
+)
+from ToDo.task_archive import TaskArchive
+from ToDo.task_graph import DependencyCycleError, TaskGraph
+from ToDo.task_history import TaskChange, TaskHistory
+from ToDo.task_journal import TaskJournal
+from ToDo.task_repository import TaskRepository
+from ToDo.task_statistics import TaskStatistics
+from ToDo.task_store import TaskStore
+
+__all__ = [
+    "DependencyCycleError",
+    "PRIORITIES",
+    "STATUSES",
+    "Recurrence",
+    "Task",
+    "TaskArchive",
+    "TaskChange",
+    "TaskGraph",
+    "TaskHistory",
+    "TaskJournal",
+    "TaskQuery",
+    "TaskRepository",
+    "TaskStatistics",
+    "TaskStore",
+    "TodoCore",
+    "matches_search",
+    "search_terms",
+]
+
+
+class TaskQuery:
+    """A status / priority / tag / project / search filter bound to a store.
+
+    ``count``, ``fetch`` and ``matches`` have the shapes VirtualTreeview
+    expects from a row source. None means "any"; every one of ``tags``
+    must match, and ``project`` includes its subprojects. ``sort`` names a
+    column to order by, walked from its sorted index in either direction.
+    """
+
+    def __init__(
+        self,
+        store,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        search: Optional[str] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        tags: Optional[Iterable[str]] = None,
+        project: Optional[str] = None,
+    ):
+        self.store = store
+        self.status = status
+        self.priority = priority
+        self.search = search
+        self.sort = sort
+        self.descending = descending
+        self.tags = parse_tags(tags)
+        self.project = normalize_project(project)
+        self.terms = search_terms(search or "")
+
+    def count(self) -> int:
+        return self.store.count(
+            self.status,
+            self.priority,
+            search=self.search,
+            tags=self.tags,
+            project=self.project,
+        )
+
+    def fetch(self, offset: int = 0, limit: Optional[int] = None) -> List[Task]:
+        return self.store.filter(
+            self.status,
+            self.priority,
+            offset=offset,
+            limit=limit,
+            search=self.search,
+            sort=self.sort,
+            descending=self.descending,
+            tags=self.tags,
+            project=self.project,
+        )
+
+    def matches(self, task: Task) -> bool:
+        """Whether a task belongs to the result, without querying the store"""
+        return (
+            (self.status is None or task.status == self.status)
+            and (self.priority is None or task.priority == self.priority)
+            and self.tags <= task.tag_set
+            and (
+                self.project is None
+                or self.project in project_ancestors(task.project)
+            )
+            and matches_search(task, self.terms)
+        )
+
+
+class TodoCore:
+    """Task operations shared by every front end.
+
+    Wraps a TaskRepository or a journal-backed TaskStore and keeps the
+    incremental TaskStatistics and dependency TaskGraph in step with every
+    mutation, so callers only have to redraw. Every mutation, single or
+    bulk, is recorded in ``history`` as one TaskChange that ``undo()`` and
+    ``redo()`` replay as a single batched store write.
+    """
+
+    def __init__(self, store, journal: Optional[TaskJournal] = None):
+        self.store = store
+        self.journal = journal
+        self.statistics = TaskStatistics.from_store(store)
+        self.graph = TaskGraph.from_store(store)
+        self.history = TaskHistory()
+
+    @classmethod
+    def open_database(
+        cls, db_path="mindflow_tasks.db", autosave_delay: Optional[float] = None
+    ) -> "TodoCore":
+        """Core over the SQLite task database"""
+        return cls(TaskRepository(db_path, autosave_delay=autosave_delay))
+
+    @classmethod
+    def open_json(
+        cls, snapshot_path="enhanced_tasks.json", compact_threshold: int = 500
+    ) -> "TodoCore":
+        """Core over an in-memory TaskStore persisted as snapshot + journal"""
+        store = TaskStore()
+        journal = TaskJournal(
+            snapshot_path,
+            snapshot_source=lambda: list(store),
+            compact_threshold=compact_threshold,
+        )
+        store.load(Task.from_dict(data) for data in journal.load())
+        return cls(store, journal)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def get(self, task_id: str) -> Optional[Task]:
+        return self.store.get(task_id)
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        search: Optional[str] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        tags: Optional[Iterable[str]] = None,
+        project: Optional[str] = None,
+    ) -> TaskQuery:
+        return TaskQuery(
+            self.store, status, priority, search, sort, descending, tags, project
+        )
+
+    def add(self, task: Task) -> Task:
+        self.add_many([task], label=f"Add {task.title!r}")
+        return task
+
+    def add_many(
+        self, tasks: List[Task], label: Optional[str] = None
+    ) -> List[Task]:
+        """Add a batch of tasks, skipping existing ids; returns those added"""
+        added = self._insert(tasks)
+        if added:
+            self.history.record(
+                TaskChange(
+                    label or f"Add {len(added)} tasks",
+                    added=[task.to_dict() for task in added],
+                )
+            )
+        return added
+
+    def import_many(self, tasks: List[Task]) -> List[Task]:
+        """Add a batch of imported tasks, skipping existing ids.
+
+        Imports arrive in many batches and can be far larger than the undo
+        budget, so like archiving they are not recorded in the undo
+        history; recording them would only evict the user's own edits.
+        """
+        return self._insert(tasks)
+
+    def edit(self, task: Task, **changes) -> Task:
+        """Apply attribute changes to a stored task"""
+        self.edit_many([(task, changes)], label=f"Edit {task.title!r}")
+        return task
+
+    def edit_many(
+        self, updates: List[Tuple[Task, Dict]], label: Optional[str] = None
+    ) -> List[Task]:
+        """Apply a batch of (task, changes) pairs as one store write"""
+        updates = list(updates)
+        before = {
+            task.id: {field: getattr(task, field) for field in changes}
+            for task, changes in updates
+        }
+        tasks = self._update(updates)
+        edited = {}
+        for task, changes in updates:
+            # Only fields whose value actually changed go into the delta
+            old = before[task.id]
+            new = {field: getattr(task, field) for field in changes}
+            changed = [field for field in new if new[field] != old[field]]
+            if changed:
+                edited[task.id] = (
+                    {field: old[field] for field in changed},
+                    {field: new[field] for field in changed},
+                )
+        if edited:
+            self.history.record(
+                TaskChange(label or f"Edit {len(tasks)} tasks", edited=edited)
+            )
+        return tasks
+
+    def complete(self, task: Task, when: Optional[datetime] = None) -> Task:
+        """Mark a task completed; a repeating task instead moves on to its
+        next occurrence until its series ends"""
+        self.edit_many(
+            [(task, self._completion(task, when))], label=f"Complete {task.title!r}"
+        )
+        return task
+
+    def complete_many(
+        self, tasks: List[Task], when: Optional[datetime] = None
+    ) -> List[Task]:
+        return self.edit_many(
+            [(task, self._completion(task, when)) for task in tasks],
+            label=f"Complete {len(tasks)} tasks",
+        )
+
+    def add_dependency(self, task: Task, depends_on: Task) -> Task:
+        """Make task wait on another; raises DependencyCycleError if that
+        task already waits on it, directly or transitively"""
+        if depends_on.id in task.depends_on:
+            return task
+        return self._edit_dependencies(
+            task,
+            task.depends_on + (depends_on.id,),
+            label=f"Make {task.title!r} depend on {depends_on.title!r}",
+        )
+
+    def remove_dependency(self, task: Task, depends_on_id: str) -> Task:
+        if depends_on_id not in task.depends_on:
+            return task
+        return self._edit_dependencies(
+            task,
+            tuple(dep for dep in task.depends_on if dep != depends_on_id),
+            label=f"Remove a dependency of {task.title!r}",
+        )
+
+    def ready(self) -> List[Task]:
+        """Uncompleted tasks whose dependencies are all completed"""
+        return self.store.get_many(self.graph.ready)
+
+    def blockers(self, task: Task) -> List[Task]:
+        """Uncompleted tasks that task is waiting on"""
+        return self.store.get_many(self.graph.blockers(task.id))
+
+    def add_tracked_time(self, task_id: str, seconds: float) -> Optional[float]:
+        """Log stopwatch time against a task; returns its new total.
+
+        Time that was actually spent is not an edit, so it is not recorded
+        in the undo history.
+        """
+        total = self.store.add_tracked_time(task_id, seconds)
+        if total is not None and self.journal is not None:
+            self.journal.put_many([self.store.get(task_id)])
+        return total
+
+    def delete(self, task_id: str) -> Optional[Task]:
+        removed = self.delete_many([task_id])
+        return removed[0] if removed else None
+
+    def delete_many(
+        self, task_ids: List[str], label: Optional[str] = None
+    ) -> List[Task]:
+        """Delete a batch of tasks as one store write; returns those deleted"""
+        removed = self._remove(task_ids)
+        if removed:
+            self.history.record(
+                TaskChange(
+                    label
+                    or (
+                        f"Delete {removed[0].title!r}"
+                        if len(removed) == 1
+                        else f"Delete {len(removed)} tasks"
+                    ),
+                    removed=[task.to_dict() for task in removed],
+                )
+            )
+        return removed
+
+    def archive_completed(
+        self,
+        archive: TaskArchive,
+        older_than: timedelta = timedelta(days=30),
+        now: Optional[datetime] = None,
+        batch_size: int = 5000,
+    ) -> int:
+        """Move tasks completed more than older_than ago into the archive.
+
+        Returns how many were archived. Archiving is housekeeping, so it is
+        not recorded in the undo history.
+        """
+        cutoff = ((now or datetime.now()) - older_than).isoformat()
+        archived = 0
+        while True:
+            tasks = self.store.completed_before(cutoff, limit=batch_size)
+            if not tasks:
+                return archived
+            archive.append(tasks)
+            self._remove([task.id for task in tasks])
+            archived += len(tasks)
+
+    def undo(self) -> Optional[TaskChange]:
+        """Revert the latest change; returns it, or None if there is none"""
+        change = self.history.pop_undo()
+        if change is not None:
+            self._apply(change.inverted())
+        return change
+
+    def redo(self) -> Optional[TaskChange]:
+        """Reapply the latest undone change"""
+        change = self.history.pop_redo()
+        if change is not None:
+            self._apply(change)
+        return change
+
+    def occurrences(
+        self, start: Optional[str] = None, end: Optional[str] = None
+    ) -> Iterator[Tuple[int, Task]]:
+        """Lazily yield (due timestamp, task) with start <= due < end.
+
+        One-off tasks come from the due-date index; repeating tasks are
+        expanded from their rule only across the requested window, from
+        their next pending occurrence on. Results are in due order.
+        """
+        start_ts, end_ts = parse_timestamp(start), parse_timestamp(end)
+        one_off = (
+            (task.due_ts, task)
+            for task in self.store.due_between(start, end)
+            if task.rule is None and task.due_ts is not None
+        )
+        series = [
+            self._expand(task, start_ts, end_ts)
+            for task in self.store.recurring()
+            if task.status != "Completed" and task.due_ts is not None
+        ]
+        return heapq.merge(one_off, *series, key=lambda item: item[0])
+
+    @staticmethod
+    def _expand(
+        task: Task, start_ts: Optional[int], end_ts: Optional[int]
+    ) -> Iterator[Tuple[int, Task]]:
+        first = task.due_ts if start_ts is None else max(start_ts, task.due_ts)
+        for due_ts in task.rule.occurrences(first, end_ts):
+            yield due_ts, task
+
+    def save(self):
+        """Write all changes through to disk and wait for it"""
+        if self.journal is not None:
+            self.journal.compact()
+            self.journal.close()
+        else:
+            self.store.commit()
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+        else:
+            self.store.close()
+
+    def _edit_dependencies(
+        self, task: Task, depends_on: Tuple[str, ...], label: str
+    ) -> Task:
+        # Stored as the same comma separated text as Task.dependencies
+        self.edit_many([(task, {"dependencies": ",".join(depends_on) or None})], label)
+        return task
+
+    def _insert(self, tasks: List[Task]) -> List[Task]:
+        added = self.store.add_many(tasks)
+        for task in added:
+            self.statistics.add(task)
+            self.graph.add(task)
+        if self.journal is not None:
+            self.journal.put_many(added)
+        return added
+
+    def _update(self, updates: List[Tuple[Task, Dict]]) -> List[Task]:
+        # Refuse a cycle before anything is written
+        for task, changes in updates:
+            if changes.get("dependencies"):
+                self.graph.check(task.id, changes["dependencies"].split(","))
+        for task, _ in updates:
+            self.statistics.remove(task)
+        try:
+            tasks = self.store.update_many(updates)
+        finally:
+            for task, _ in updates:
+                self.statistics.add(task)
+                self.graph.update(task)
+        if self.journal is not None:
+            self.journal.put_many(tasks)
+        return tasks
+
+    def _remove(self, task_ids: List[str]) -> List[Task]:
+        removed = self.store.remove_many(task_ids)
+        for task in removed:
+            self.statistics.remove(task)
+            self.graph.remove(task)
+        if self.journal is not None:
+            self.journal.delete_many([task.id for task in removed])
+        return removed
+
+    def _apply(self, change: TaskChange):
+        """Replay a change without recording it"""
+        if change.removed:
+            self._remove([data["id"] for data in change.removed])
+        if change.added:
+            self._insert([Task.from_dict(data) for data in change.added])
+        if change.edited:
+            tasks = self.store.get_many(change.edited)
+            self._update([(task, change.edited[task.id][1]) for task in tasks])
+
+    @staticmethod
+    def _completion(task: Task, when: Optional[datetime]) -> Dict:
+        """Changes that complete a task, or advance a repeating one"""
+        if task.rule is not None and task.due_ts is not None:
+            next_ts = task.rule.next_after(task.due_ts)
+            if next_ts is not None:
+                return {"due_date": format_due(next_ts)}
+        return {
+            "status": "Completed",
+            "completed_at": (when or datetime.now()).isoformat(),
+        }
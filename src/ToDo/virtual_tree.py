@@ -0,0 +1,323 @@
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+# Modifier bits of a Tk event's state
+SHIFT_MASK = 0x0001
+CONTROL_MASK = 0x0004
+
+
+class VirtualTreeview(ttk.Frame):
+    """A Treeview that only materializes the rows currently on screen.
+
+    Rows come from a ``count()`` / ``fetch(offset, limit)`` pair instead of
+    being inserted up front. The view keeps one screenful of Treeview items
+    and a small prefetch buffer of records around it, and drives its own
+    scrollbar over the full result.
+
+    Treeview items are reconciled against the records they show: each item
+    is mapped to its record key, and a repaint only deletes, inserts, moves
+    or reconfigures the items whose record changed. Single-record mutations
+    (``insert``, ``update``, ``remove``) therefore touch one or two items.
+
+    ``row_key(record)`` returns a unique key for a record and
+    ``render_row(record)`` returns its ``(values, tags)``.
+
+    The selection is kept as record keys rather than Treeview items, since
+    items are recycled as the view scrolls: it is reapplied to whichever
+    items show selected records on every repaint, so a selected row that
+    scrolls out and back is still selected. ``select_all()`` additionally
+    marks the whole result as selected (``all_selected``) until the user
+    changes the selection.
+    """
+
+    def __init__(
+        self,
+        master,
+        row_key: Callable[[object], Hashable],
+        render_row: Callable[[object], Tuple[Sequence, Sequence[str]]],
+        buffer_rows: int = 50,
+        **tree_options,
+    ):
+        super().__init__(master)
+        self.row_key = row_key
+        self.render_row = render_row
+        self.buffer_rows = buffer_rows
+
+        self.tree = ttk.Treeview(self, **tree_options)
+        self.scrollbar = ttk.Scrollbar(
+            self, orient=VERTICAL, command=self._on_scrollbar
+        )
+        self.tree.pack(side=LEFT, fill=BOTH, expand=YES)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+
+        self._count: Callable[[], int] = lambda: 0
+        self._fetch: Callable[[int, int], List] = lambda offset, limit: []
+        self._matches: Callable[[object], bool] = lambda record: True
+        self.total = 0
+        self.offset = 0
+        self.visible_rows = tree_options.get("height", 10)
+        self._cache_offset = 0
+        self._cache: List = []
+
+        # Reconciliation state for the items currently in the Treeview
+        self._items: Dict[Hashable, str] = {}  # record key -> item id
+        self._keys: Dict[str, Hashable] = {}  # item id -> record key
+        self._order: List[Hashable] = []  # record keys in display order
+        self._rendered: Dict[Hashable, Tuple] = {}  # record key -> (values, tags)
+        self._selected: Set[Hashable] = set()  # record keys, also off screen
+        self.all_selected = False
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        self.tree.bind("<Button-1>", self._on_click, add="+")
+        self.tree.bind("<Control-a>", lambda e: self._select_all_and_break())
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", self._on_mousewheel)
+        self.tree.bind("<Button-5>", self._on_mousewheel)
+        self.tree.bind("<Up>", lambda e: self._on_arrow(e, -1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow(e, 1))
+        self.tree.bind("<Prior>", lambda e: self._scroll_and_break(-self.visible_rows))
+        self.tree.bind("<Next>", lambda e: self._scroll_and_break(self.visible_rows))
+
+    def set_source(
+        self,
+        count: Callable[[], int],
+        fetch: Callable[[int, int], List],
+        matches: Optional[Callable[[object], bool]] = None,
+    ):
+        """Show a new result set, starting from the top.
+
+        ``matches(record)`` tells whether a record belongs to the result;
+        it lets single-record mutations be applied without a re-query.
+        """
+        self._count = count
+        self._fetch = fetch
+        self._matches = matches or (lambda record: True)
+        self.offset = 0
+        self.all_selected = False
+        self._selected.clear()
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the current source and repaint the visible window"""
+        self.total = self._count()
+        self._cache = []
+        self.offset = self._clamp(self.offset)
+        self._repaint()
+
+    def selected_keys(self) -> List[Hashable]:
+        """Record keys of the selected rows, visible ones first"""
+        visible = [key for key in self._order if key in self._selected]
+        return visible + list(self._selected.difference(visible))
+
+    def select_all(self):
+        """Select every record of the result, including those off screen"""
+        self.all_selected = True
+        self.tree.selection_set(self.tree.get_children())
+
+    def deselect_all(self):
+        self.all_selected = False
+        self._selected.clear()
+        self.tree.selection_remove(self.tree.selection())
+
+    def insert(self, record):
+        """Show a record that was appended to the end of the source"""
+        if not self._matches(record):
+            return
+
+        if self._cache_offset + len(self._cache) == self.total:
+            self._cache.append(record)
+        self.total += 1
+        self._repaint()
+
+    def update(self, record):
+        """Show the new state of a record that is already in the source"""
+        key = self.row_key(record)
+        index = self._cache_index(key)
+        if index is None or not self._matches(record):
+            # Off screen, or it left the result: positions may have shifted
+            if not self._matches(record):
+                self._selected.discard(key)
+            self.refresh()
+            return
+
+        self._cache[index] = record
+        self._repaint()
+
+    def remove(self, key: Hashable):
+        """Drop a record that was deleted from the source"""
+        index = self._cache_index(key)
+        if index is None:
+            self._selected.discard(key)
+            self.refresh()
+            return
+
+        self._selected.discard(key)
+        del self._cache[index]
+        self.total -= 1
+        self.offset = self._clamp(self.offset)
+        self._repaint()
+
+    def scroll_to(self, offset: int) -> bool:
+        """Scroll so the record at offset is the first visible row"""
+        offset = self._clamp(offset)
+        if offset == self.offset:
+            return False
+        self.offset = offset
+        self._repaint()
+        return True
+
+    def scroll_by(self, rows: int) -> bool:
+        return self.scroll_to(self.offset + rows)
+
+    def _clamp(self, offset: int) -> int:
+        return max(0, min(offset, self.total - self.visible_rows))
+
+    def _cache_index(self, key: Hashable) -> Optional[int]:
+        """Position of a visible record in the prefetch cache"""
+        if key not in self._items:
+            return None
+        start = self.offset - self._cache_offset
+        for index in range(start, min(start + self.visible_rows, len(self._cache))):
+            if self.row_key(self._cache[index]) == key:
+                return index
+        return None
+
+    def _window(self) -> List:
+        """Records for the visible rows, fetched through the prefetch buffer"""
+        end = min(self.offset + self.visible_rows, self.total)
+        cache_end = self._cache_offset + len(self._cache)
+        if not (self._cache_offset <= self.offset and end <= cache_end):
+            self._cache_offset = max(0, self.offset - self.buffer_rows)
+            self._cache = self._fetch(
+                self._cache_offset, self.visible_rows + 2 * self.buffer_rows
+            )
+        start = self.offset - self._cache_offset
+        return self._cache[start : start + self.visible_rows]
+
+    def _repaint(self):
+        self._reconcile(self._window())
+        if self.all_selected:
+            self.tree.selection_set(self.tree.get_children())
+        else:
+            self.tree.selection_set(
+                [self._items[key] for key in self._order if key in self._selected]
+            )
+        self._update_scrollbar()
+
+    def _reconcile(self, records: List):
+        """Bring the Treeview items in line with records, touching as few
+        items as possible"""
+        rows = [(self.row_key(record), self.render_row(record)) for record in records]
+        wanted = {key for key, _ in rows}
+
+        for key in [key for key in self._order if key not in wanted]:
+            iid = self._items.pop(key)
+            del self._keys[iid]
+            del self._rendered[key]
+            self.tree.delete(iid)
+
+        order = [key for key in self._order if key in wanted]
+        for index, (key, rendered) in enumerate(rows):
+            values, tags = rendered
+            iid = self._items.get(key)
+            if iid is None:
+                iid = self.tree.insert("", index, values=values, tags=tags)
+                self._items[key] = iid
+                self._keys[iid] = key
+                order.insert(index, key)
+            else:
+                if order[index] != key:
+                    self.tree.move(iid, "", index)
+                    order.remove(key)
+                    order.insert(index, key)
+                if self._rendered[key] != rendered:
+                    self.tree.item(iid, values=values, tags=tags)
+            self._rendered[key] = rendered
+        self._order = order
+
+    def _update_scrollbar(self):
+        if self.total <= self.visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(
+                self.offset / self.total,
+                (self.offset + self.visible_rows) / self.total,
+            )
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.total))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_by(-3)
+        else:
+            self.scroll_by(3)
+        return "break"
+
+    def _on_arrow(self, event, step: int):
+        children = self.tree.get_children()
+        focus = self.tree.focus()
+        if not children or focus not in children:
+            return None
+        if not event.state & SHIFT_MASK:
+            # Moving the cursor replaces the selection, as a click does
+            self._selected.intersection_update(self._order)
+
+        index = children.index(focus) + step
+        if 0 <= index < len(children):
+            return None  # Let the Treeview move the selection itself
+
+        if self.scroll_by(step):
+            key = self._order[0 if step < 0 else -1]
+            target = self._items[key]
+            self._selected = {key}
+            self.tree.selection_set(target)
+            self.tree.focus(target)
+        return "break"
+
+    def _on_select(self, event):
+        if self.all_selected and set(self.tree.selection()) != set(
+            self.tree.get_children()
+        ):
+            self.all_selected = False
+        # The Treeview only knows about visible rows; off-screen selected
+        # records keep their state
+        shown = {self._keys[iid] for iid in self.tree.selection() if iid in self._keys}
+        self._selected.difference_update(self._order)
+        self._selected.update(shown)
+
+    def _on_click(self, event):
+        # A plain click on a row replaces the selection, including off-screen
+        # rows
+        if self.tree.identify_row(event.y) and not event.state & (
+            CONTROL_MASK | SHIFT_MASK
+        ):
+            self._selected.clear()
+
+    def _select_all_and_break(self):
+        self.select_all()
+        return "break"
+
+    def _scroll_and_break(self, rows: int):
+        self.scroll_by(rows)
+        return "break"
+
+    def _on_configure(self, event):
+        if not self._order:
+            return
+        bbox = self.tree.bbox(self._items[self._order[0]])
+        if not bbox:
+            return
+
+        _, heading_height, _, row_height = bbox
+        rows = max(1, (event.height - heading_height) // row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.offset = self._clamp(self.offset)
+            self._repaint()
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The ToDo and Stopwatch packages live in src/, which is only on the path
+# when pytest is started from there
+SRC = str(Path(__file__).resolve().parent.parent)
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
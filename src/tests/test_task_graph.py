@@ -0,0 +1,30 @@
+from ToDo.task import Task
+from ToDo.task_store import TaskStore
+from ToDo.todo_core import TodoCore
+
+
+def titles(tasks):
+    return sorted(task.title for task in tasks)
+
+
+def test_ready_set_follows_changes_without_rescanning():
+    first, second, third = Task("first"), Task("second"), Task("third")
+    second.dependencies = first.id
+    store = TaskStore()
+    store.load([first, second, third])
+    core = TodoCore(store)
+    scans = []
+    pending_ids = core.graph.pending_ids
+    core.graph.pending_ids = lambda: scans.append(1) or pending_ids()
+
+    assert titles(core.ready()) == ["first", "third"]
+    core.complete(first)
+    assert titles(core.ready()) == ["second", "third"]
+    core.add_dependency(third, second)
+    assert titles(core.ready()) == ["second"]
+    core.undo()
+    core.undo()
+    assert titles(core.ready()) == ["first", "third"]
+    core.delete(first.id)
+    assert titles(core.ready()) == ["second", "third"]
+    assert scans == [1]
@@ -0,0 +1,259 @@
+import json
+import sqlite3
+
+import pytest
+
+from ToDo.task import Task
+from ToDo.task_repository import TaskRepository
+from ToDo.task_store import TaskStore
+from ToDo.todo_core import TodoCore
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = TaskRepository(tmp_path / "tasks.db")
+    yield repository
+    repository.close()
+
+
+def dated_tasks():
+    return [
+        Task("legacy", due_date="2024/05/06"),
+        Task("date only", due_date="2024-05-06"),
+        Task("morning", due_date="2024-05-06T09:30:00"),
+        Task("evening", due_date="2024-05-05T23:59:59"),
+        Task("later", due_date="2024-06-01"),
+        Task(
+            "weekly",
+            due_date="2024-05-01",
+            recurrence="FREQ=WEEKLY;DTSTART=2024-05-01",
+        ),
+        Task("undated"),
+    ]
+
+
+def titles(occurrences):
+    return [(due_ts, task.title) for due_ts, task in occurrences]
+
+
+def test_due_between_compares_instants(repository):
+    repository.add_many(dated_tasks())
+
+    tasks = repository.due_between("2024-05-06T00:00:00", "2024-05-07")
+    assert [task.title for task in tasks] == ["date only", "morning"]
+
+
+def test_occurrences_skip_legacy_due_dates(repository):
+    repository.add_many(dated_tasks())
+    store = TaskStore()
+    store.load(dated_tasks())
+
+    expected = titles(TodoCore(store).occurrences("2024-05-01", "2025-01-01"))
+    result = titles(TodoCore(repository).occurrences("2024-05-01", "2025-01-01"))
+    assert result == expected
+    assert "legacy" not in {title for _, title in result}
+    assert [title for _, title in result[:4]] == [
+        "weekly",
+        "evening",
+        "date only",
+        "morning",
+    ]
+
+
+def test_due_ts_follows_edits(repository):
+    task = Task("moved", due_date="2024/05/06")
+    repository.add(task)
+    repository.update(task, due_date="2024-05-10")
+
+    assert [t.id for t in repository.due_between("2024-05-10", "2024-05-11")] == [
+        task.id
+    ]
+
+
+def test_due_ts_backfilled_for_older_databases(tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tasks (id TEXT PRIMARY KEY, title TEXT NOT NULL, "
+        "description TEXT, due_date TEXT, priority TEXT, status TEXT, "
+        "created_at TEXT, completed_at TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO tasks VALUES (?, ?, '', ?, 'Medium', 'Pending', "
+        "'2024-01-01T00:00:00', NULL)",
+        [("a", "legacy", "2024/05/06"), ("b", "dated", "2024-05-06T08:00:00")],
+    )
+    conn.commit()
+    conn.close()
+
+    repository = TaskRepository(path)
+    try:
+        tasks = repository.due_between("2024-05-06", "2024-05-07")
+        assert [task.id for task in tasks] == ["b"]
+    finally:
+        repository.close()
+
+
+def test_tags_with_control_characters_are_indexed(tmp_path):
+    path = tmp_path / "old.db"
+    repository = TaskRepository(path)
+    # The trigger of older databases, which built a JSON array from the tags
+    repository.conn.executescript(
+        """
+        DROP TRIGGER tasks_tags_insert;
+        CREATE TRIGGER tasks_tags_insert AFTER INSERT ON tasks BEGIN
+            INSERT OR IGNORE INTO task_tags (tag, task_rowid)
+            SELECT value, new.rowid FROM json_each(
+                '["' || replace(new.tags, ',', '","') || '"]'
+            ) WHERE new.tags IS NOT NULL;
+        END;
+        """
+    )
+    repository.close()
+
+    repository = TaskRepository(path)
+    try:
+        task = Task("tabbed")
+        repository.add(task)
+        repository.conn.execute(
+            "UPDATE tasks SET tags = ? WHERE id = ?", ("to\tdo,work", task.id)
+        )
+        repository.conn.execute(
+            "INSERT INTO tasks (id, title, tags) VALUES ('raw', 'raw', 'a\x01b')"
+        )
+        rows = repository.conn.execute(
+            "SELECT tasks.id, tag FROM task_tags "
+            "JOIN tasks ON tasks.rowid = task_rowid ORDER BY tag"
+        ).fetchall()
+        assert [tuple(row) for row in rows] == [
+            ("raw", "a\x01b"),
+            (task.id, "to\tdo"),
+            (task.id, "work"),
+        ]
+    finally:
+        repository.close()
+
+
+SORTS = ("title", "priority", "due_date", "status")
+FILTERS = (
+    {"status": "Pending"},
+    {"priority": "High"},
+    {"status": "Pending", "priority": "High"},
+    {"tags": ["work"]},
+    {"project": "Work"},
+    {"status": "Pending", "tags": ["work"], "project": "Work"},
+)
+
+
+def filtered_tasks(count=300):
+    return [
+        Task(
+            f"task {i % 17}",
+            due_date=(
+                "someday"  # unparseable legacy value
+                if i % 11 == 5
+                else f"2024-05-{i % 28 + 1:02d}" if i % 3 else None
+            ),
+            priority=("High", "Medium", "Low")[i % 3],
+            status=("Pending", "Completed")[i % 2],
+            tags="work,home" if i % 4 else "home",
+            project="Work/Site" if i % 5 else "Home",
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("descending", (False, True))
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filtered_sorted_pages_walk_an_index(
+    repository, sort, descending, filters
+):
+    repository.add_many(filtered_tasks())
+    # Make every tag and project filter count as large
+    repository.SMALL_RESULT = 10
+
+    sql, params = repository._page_query(
+        filters.get("status"),
+        filters.get("priority"),
+        None,
+        sort,
+        descending,
+        filters.get("tags"),
+        filters.get("project"),
+    )
+    cursor = repository.conn.execute(f"EXPLAIN QUERY PLAN {sql}", (*params, 50, 0))
+    plan = [row[3] for row in cursor]
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+@pytest.mark.parametrize("small_result", (10, 2000))
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filtered_sorted_pages_match_task_store(
+    repository, small_result, sort, filters
+):
+    tasks = filtered_tasks()
+    repository.add_many(tasks)
+    repository.SMALL_RESULT = small_result
+    store = TaskStore()
+    store.load(tasks)
+
+    for descending in (False, True):
+        expected = store.filter(sort=sort, descending=descending, **filters)
+        result = repository.filter(sort=sort, descending=descending, **filters)
+        assert [task.id for task in result] == [task.id for task in expected]
+
+
+def test_task_dependencies_cover_only_the_dependency_graph(repository):
+    first, second, third, lone = (Task(title) for title in "abcd")
+    second.dependencies = first.id
+    third.dependencies = f"{second.id},missing"
+    repository.add_many([first, second, third, lone])
+    repository.update(first, status="Completed")
+
+    assert sorted(repository.task_dependencies()) == sorted(
+        [
+            (second.id, "Pending", first.id),
+            (third.id, "Pending", f"{second.id},missing"),
+            (first.id, "Completed", None),
+        ]
+    )
+    core = TodoCore(repository)
+    assert {task.title for task in core.ready()} == {"b", "d"}
+    assert core.graph.is_blocked(third.id)
+
+
+def test_migrated_records_are_normalized_like_tasks(tmp_path):
+    record = {
+        "id": "legacy",
+        "title": "Legacy",
+        "description": "",
+        "due_date": "2024-05-06T09:30",
+        "priority": "High",
+        "status": "Pending",
+        "created_at": "2024-01-01T00:00:00",
+        "completed_at": None,
+        "tags": " Work, #Home ,",
+        "project": "Work / Site",
+    }
+    json_path = tmp_path / "enhanced_tasks.json"
+    json_path.write_text(json.dumps([record]))
+    repository = TaskRepository(tmp_path / "tasks.db")
+    try:
+        repository.migrate_from_json(json_path)
+
+        row = repository.conn.execute(
+            "SELECT tags, project, due_date, due_ts FROM tasks WHERE id = 'legacy'"
+        ).fetchone()
+        expected = Task.from_dict(record)
+        assert tuple(row) == (
+            "home,work",
+            "Work/Site",
+            expected.due_date,
+            expected.due_ts,
+        )
+        assert [task.id for task in repository.filter(tags=["work"])] == ["legacy"]
+        assert [task.id for task in repository.filter(project="Work")] == ["legacy"]
+    finally:
+        repository.close()
@@ -0,0 +1,33 @@
+import json
+
+from ToDo.task_store import TaskStore
+from ToDo.task_transfer import TaskImporter
+
+
+def test_bad_field_types_are_rejected_per_record(tmp_path):
+    records = [
+        {"title": "first", "tags": "work,home"},
+        {"title": "bad tags", "tags": 5},
+        {"title": "second", "tags": ["a", "b"]},
+        {"title": "bad dependencies", "dependencies": 5},
+        {"title": "bad time", "tracked_seconds": [1]},
+        {"title": "bad description", "description": {"text": "x"}},
+        {"title": "third", "tracked_seconds": "12.5"},
+    ]
+    path = tmp_path / "tasks.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    store = TaskStore()
+
+    importer = TaskImporter(store, path, batch_size=100)
+    batches = list(importer.run())
+
+    assert len(batches) == 1
+    assert sorted(task.title for task in store) == ["first", "second", "third"]
+    assert importer.imported == 3
+    assert importer.error_count == 4
+    assert [error.split(":")[0] for error in importer.errors] == [
+        "Line 2",
+        "Line 4",
+        "Line 5",
+        "Line 6",
+    ]